@@ -1,88 +1,139 @@
 # PetMate: 반려동물 통합 케어 앱 (Streamlit)
-import os, json, uuid
-from datetime import datetime, date, time, timedelta
-from dateutil import tz
+import io, os
+from datetime import datetime, time, timedelta
 import pandas as pd
 import streamlit as st
-import hashlib
+from petmate import instrument
+from petmate.bulkio import import_logs, export_archive
+from petmate.events import KST, EventIndex
+from petmate.reminders import ReminderQueue, ical_lines
+from petmate.service import PetMateService
+
+# ===== 페이지 설정 =====
+# 첫 Streamlit 명령이어야 한다 (st.cache_resource도 스피너 자리를 만들므로 그보다 먼저)
+st.set_page_config(page_title="PetMate",page_icon="🐾",layout="wide")
 
 # ===== 경로 설정 =====
 DATA_DIR = "data"
-USER_FILE = os.path.join(DATA_DIR, "users.json")
-PHOTO_DIR = os.path.join(DATA_DIR, "pet_photos")
-os.makedirs(PHOTO_DIR, exist_ok=True)
-PET_FILE = os.path.join(DATA_DIR, "pets.json")
-FEED_FILE = os.path.join(DATA_DIR, "feed_log.csv")
-WATER_FILE = os.path.join(DATA_DIR, "water_log.csv")
-MED_FILE = os.path.join(DATA_DIR, "med_schedule.json")
-HOSP_FILE = os.path.join(DATA_DIR, "hospital_events.json")
-UNSAFE_FILE = os.path.join(DATA_DIR, "unsafe_db.json")
 os.makedirs(DATA_DIR, exist_ok=True)
 
 # ===== 유틸 =====
-def load_json(path, default):
-    if os.path.exists(path):
-        try:
-            with open(path,"r",encoding="utf-8") as f: return json.load(f)
-        except: return default
-    return default
-def save_json(path,data):
-    with open(path,"w",encoding="utf-8") as f: json.dump(data,f,ensure_ascii=False,indent=2)
 if "user" not in st.session_state:
     st.session_state.user = None   # 현재 로그인한 사용자
 
-def load_users():
-    return load_json(USER_FILE, [])
-
-def save_users(users):
-    save_json(USER_FILE, users)
-
-def load_csv(path,cols):
-    if os.path.exists(path):
-        try: return pd.read_csv(path)
-        except: return pd.DataFrame(columns=cols)
-    return pd.DataFrame(columns=cols)
-def save_csv(path,df): df.to_csv(path,index=False)
-def local_today(): return datetime.now(tz.gettz("Asia/Seoul")).date()
-
-def hash_password(password: str) -> str:
-    """SHA-256으로 비밀번호를 해시"""
-    return hashlib.sha256(password.encode()).hexdigest()
-
-
-# ===== 초기 세션 =====
-if "pets" not in st.session_state: st.session_state.pets = load_json(PET_FILE,[])
-if "med_schedule" not in st.session_state: st.session_state.med_schedule = load_json(MED_FILE,[])
-if "hospital_events" not in st.session_state: st.session_state.hospital_events = load_json(HOSP_FILE,[])
-if "unsafe_db" not in st.session_state:
-    default_unsafe=[{"category":"음식","name":"초콜릿","risk":"고위험","why":"카카오의 메틸잔틴(테오브로민) 독성"},
-                    {"category":"음식","name":"포도/건포도","risk":"고위험","why":"급성 신장손상 보고"}]
-    st.session_state.unsafe_db = load_json(UNSAFE_FILE,default_unsafe)
-
-feed_cols=["log_id","pet_id","date","amount_g","memo"]
-water_cols=["log_id","pet_id","date","amount_ml","memo"]
-feed_df = load_csv(FEED_FILE,feed_cols)
-water_df = load_csv(WATER_FILE,water_cols)
-
-def recommended_food_grams(species:str,weight_kg:float)->tuple:
-    if weight_kg<=0: return (0,0)
-    if species.lower() in ["개","강아지","dog"]:
-        kcal=weight_kg*30+70; grams=round(kcal/3.5)
-    else:
-        kcal=60*weight_kg; grams=round(kcal/3.5)
-    return grams,max(0,round(grams*0.1))
-def recommended_water_ml(weight_kg:float)->int:
-    return int(round(weight_kg*60)) if weight_kg>0 else 0
+def local_today(): return datetime.now(KST).date()
+def local_now(): return datetime.now(KST).replace(tzinfo=None,second=0,microsecond=0)
+
+
+# ===== 공유 서비스 & 세션 동기화 =====
+@st.cache_resource
+def get_service():
+    """데이터 작업은 모두 이 서비스로 (프로세스 전체 공유, HTTP API와 같은 코드). 화면은 그리기만 한다."""
+    return PetMateService(DATA_DIR)
+svc = get_service()
+SESSION_DATA = ("pets","med_schedule","hospital_events")
+
+def store_for(name):
+    return svc.stores(st.session_state.user)[name]
+
+def data(name):
+    """로그인한 사용자의 레코드 목록. 처음 쓰일 때 읽고(lazy), 파일이 바뀌었으면 다시 읽는다."""
+    ver = store_for(name).version()
+    if name not in st.session_state or st.session_state.get(f"_ver_{name}")!=ver:
+        if name in st.session_state:
+            st.toast("다른 세션에서 데이터가 변경되어 최신 내용으로 새로 불러왔습니다.")
+        with instrument.span(f"load:{name}"): st.session_state[name] = store_for(name).load()
+        st.session_state[f"_ver_{name}"] = ver
+    return st.session_state[name]
+
+def commit(name,records):
+    """저장소가 돌려준 최신 목록으로 세션을 맞춘다 (자기 쓰기는 알림 대상이 아님)"""
+    st.session_state[name] = records
+    st.session_state[f"_ver_{name}"] = store_for(name).committed_version()
+
+def reset_session_data():
+    # 로그아웃/계정 삭제 시 이전 사용자의 데이터가 세션에 남지 않도록
+    for name in SESSION_DATA:
+        st.session_state.pop(name,None); st.session_state.pop(f"_ver_{name}",None)
+    st.session_state.pop("_reminders",None); st.session_state.pop("_event_index",None)
+    st.session_state.pop("_pet_edits",None)
+
+def event_index():
+    """내 병원 일정의 시간순 인덱스. 일정 파일이 바뀔 때만 다시 만든다 (내 추가/삭제는 바로 반영)."""
+    events = data("hospital_events")
+    ver = st.session_state.get("_ver_hospital_events")
+    cached = st.session_state.get("_event_index")
+    if not cached or cached[0]!=ver:
+        cached = st.session_state["_event_index"] = (ver,EventIndex(events))
+    return cached[1]
+
+def save_event(fields=None,delete_id=None):
+    """일정 추가(fields: svc.add_event 인자)/삭제. 인덱스가 쓰기 직전 파일 버전 그대로였다면
+    한 건만 고치고, 아니면 다음에 재구성. 입력이 잘못되면 ValueError."""
+    idx,base = event_index(),st.session_state.get("_ver_hospital_events")
+    in_step = []
+    def hook(before,after): in_step.append(before==base)
+    user = st.session_state.user
+    if fields: records,rec = svc.add_event(user,on_commit=hook,**fields)
+    else: records,rec = svc.delete_event(user,delete_id,on_commit=hook),None
+    commit("hospital_events",records)
+    if in_step and in_step[0]:
+        if rec: idx.add(rec)
+        else: idx.remove(delete_id)
+        st.session_state["_event_index"] = (st.session_state["_ver_hospital_events"],idx)
+
+def reminder_queue(now):
+    """내 복약 스케줄의 알림 큐. 스케줄 파일이 바뀔 때만 다시 만들고, 그 외 재실행에서는 커서만 옮긴다."""
+    meds = data("med_schedule")
+    ver = st.session_state.get("_ver_med_schedule")
+    cached = st.session_state.get("_reminders")
+    if not cached or cached[0]!=ver:
+        cached = st.session_state["_reminders"] = (ver,ReminderQueue(meds,now))
+    return cached[1]
+
+def store_upload(upload):
+    """업로드를 사진 저장소에 넣고 키를 반환 (업로더에 남아 있는 같은 파일은 재실행마다 다시 해시하지 않음).
+    저장하지 않은 채 오래 둬서 정리된 파일이면 다시 넣는다."""
+    seen = st.session_state.setdefault("_photo_uploads",{})
+    fid = getattr(upload,"file_id",None) or (upload.name,upload.size)
+    if fid not in seen or not os.path.exists(svc.photos.original_path(seen[fid])):
+        seen[fid] = svc.photos.put(upload.getvalue(),upload.name)
+    return seen[fid]
+
+PET_PAGE = 20
+SPECIES = ["개","고양이","기타"]
+
+def pet_edits():
+    """프로필 탭에서 아직 저장하지 않은 변경: {pet_id: 수정본, 삭제 예정이면 None}"""
+    return st.session_state.setdefault("_pet_edits",{})
+
+def flush_pet_edits():
+    """모아 둔 수정/삭제를 한 번의 쓰기로 저장하고 건수를 반환 (잘못된 항목이 있으면 ValueError, 아무것도 쓰지 않음)"""
+    edits,user = pet_edits(),st.session_state.user
+    live = svc.pet_ids(user)   # 그 사이 다른 세션에서 삭제된 반려동물은 되살리지 않는다
+    ups = [r for i,r in edits.items() if r is not None and i in live]
+    dels = [i for i,r in edits.items() if r is None]
+    commit("pets",svc.save_pets(user,ups,deletes=dels))
+    edits.clear()
+    return len(ups)+len(dels)
+
+def discard_pet_edits():
+    # 폼 입력값도 저장된 내용으로 되돌린다
+    for pid in pet_edits():
+        for f in ("name","species","breed","birth","weight","notes","photo"): st.session_state.pop(f"{f}_{pid}",None)
+    pet_edits().clear()
+
 def pet_selector(label="반려동물 선택", key=None):
-    pets=st.session_state.pets
+    pets=data("pets")
     if not pets:
         st.info("먼저 반려동물을 등록해 주세요 (왼쪽 '반려동물 프로필').")
         return None
     opts={f"{p['name']} ({p['species']})":p for p in pets}
     return opts[st.selectbox(label,list(opts.keys()), key=key)]
 
-# ===== 페이지 설정 =====
-st.set_page_config(page_title="PetMate",page_icon="🐾",layout="wide")
+# 성능 계측은 선택: PETMATE_PROFILE=1 로 실행하거나 주소에 ?debug=1 을 붙이면 켜진다
+PROFILE = os.environ.get("PETMATE_PROFILE")=="1" or st.query_params.get("debug")=="1"
+if PROFILE: instrument.begin("rerun")
 st.title("🐾 PetMate")
 
 # ===== 로그인 상태 확인 =====
@@ -90,11 +141,9 @@ if not st.session_state.user:
     # 로그인하지 않은 상태 - 로그인/회원가입 탭만 표시
     tab_login = st.tabs(["로그인/회원가입"])[0]
     
-    with tab_login:
+    with tab_login, instrument.span("tab:로그인"):
         st.header("🔐 로그인 & 회원가입")
         st.info("PetMate에 오신 것을 환영합니다! 로그인 후 모든 기능을 이용하실 수 있습니다.")
-        
-        users = load_users()
 
         tab1, tab2 = st.tabs(["로그인", "회원가입"])
 
@@ -103,12 +152,16 @@ if not st.session_state.user:
             username = st.text_input("아이디")
             password = st.text_input("비밀번호", type="password")
             if st.button("로그인"):
-                hashed = hash_password(password)
-                if any(u["username"] == username and u["password"] == hashed for u in users):
+                # 아이디 색인 조회 + 해시 확인(전용 스레드 풀). 예전 SHA-256 해시는 이때 새 해시로 바뀐다.
+                try:
+                    with st.spinner("확인 중…"): ok = svc.auth.login(username,password)
+                except ValueError as e:
+                    st.error(str(e)); ok = None
+                if ok:
                     st.session_state.user = username
                     st.success(f"{username}님 로그인 성공!")
                     st.rerun()  # 페이지 새로고침으로 메인 화면 표시
-                else:
+                elif ok is False:
                     st.error("아이디 또는 비밀번호가 올바르지 않습니다.")
 
         # ---------------- 회원가입 ----------------
@@ -116,17 +169,10 @@ if not st.session_state.user:
             new_user = st.text_input("새 아이디")
             new_pass = st.text_input("새 비밀번호", type="password")
             if st.button("회원가입"):
-                if not new_user or not new_pass:
-                    st.error("아이디와 비밀번호를 모두 입력해주세요.")
-                elif any(u["username"] == new_user for u in users):
-                    st.error("이미 존재하는 아이디입니다.")
-                else:
-                    users.append({
-                        "username": new_user,
-                        "password": hash_password(new_pass)
-                    })
-                    save_users(users)
-                    st.success("회원가입 완료! 로그인 탭에서 로그인하세요.")
+                # 계정 파일 끝에 한 줄만 덧붙인다 (잠금 안에서 중복 확인)
+                try: svc.auth.signup(new_user,new_pass)
+                except ValueError as e: st.error(str(e))
+                else: st.success("회원가입 완료! 로그인 탭에서 로그인하세요.")
 
 else:
     # 로그인한 상태 - 모든 탭 표시
@@ -136,6 +182,7 @@ else:
     with col2:
         if st.button("로그아웃"):
             st.session_state.user = None
+            reset_session_data()
             st.rerun()
 
     tab_dash, tab_profile, tab_feed, tab_med, tab_hosp, tab_risk, tab_data = st.tabs([
@@ -143,7 +190,7 @@ else:
     ])
 
     # ===== 대시보드 =====
-    with tab_dash:
+    with tab_dash, instrument.span("tab:대시보드"):
         st.header("📊 오늘 한눈에 보기")
         pet = pet_selector(key="dashboard_pet_selector")
         if pet:
@@ -155,29 +202,51 @@ else:
                 st.write(f"**체중**: {pet.get('weight_kg','-')} kg")
                 if pet.get("birth"): st.write(f"**생일**: {pet['birth']}")
                 if pet.get("notes"): st.caption(pet["notes"])
-                if pet.get("photo_path") and os.path.exists(pet["photo_path"]):
+                if pet.get("photo_id"):
+                    thumb = svc.photos.thumbnail(pet["photo_id"])   # 150px 썸네일, 메모리 캐시
+                    if thumb: st.image(thumb,width=150)
+                elif pet.get("photo_path") and os.path.exists(pet["photo_path"]):
                     st.image(pet["photo_path"],width=150)
+            s = svc.intake(pet,local_today().isoformat())
             with col2:
-                grams,snack_limit = recommended_food_grams(pet["species"],float(pet.get("weight_kg",0) or 0))
-                today = local_today().isoformat()
-                eaten = feed_df[(feed_df["pet_id"]==pet["id"]) & (feed_df["date"]==today)]["amount_g"].sum()
+                grams,eaten = s["food_target_g"],s["eaten_g"]
                 st.subheader("사료/간식 권장량")
-                st.write(f"권장: {grams} g/일 / 간식 상한: {snack_limit} g")
+                st.write(f"권장: {grams} g/일 / 간식 상한: {s['snack_limit_g']} g")
                 st.progress(min(1.0,eaten/grams if grams else 0),text=f"오늘 섭취: {int(eaten)} g")
             with col3:
-                wml = recommended_water_ml(float(pet.get("weight_kg",0) or 0))
-                drank = water_df[(water_df["pet_id"]==pet["id"]) & (water_df["date"]==today)]["amount_ml"].sum()
+                wml,drank = s["water_target_ml"],s["drank_ml"]
                 st.subheader("물 권장량")
                 st.write(f"권장: {wml} ml/일")
                 st.progress(min(1.0,drank/wml if wml else 0),text=f"오늘 급수: {int(drank)} ml")
 
+            # 켰을 때만 계산한다 (접힌 expander 안의 코드도 재실행마다 실행되므로 토글로 막는다)
+            if st.toggle("📈 기간 건강 리포트 (모든 반려동물)",key="report_on"):
+                rc1,rc2 = st.columns(2)
+                with rc1: r_start = st.date_input("시작일",value=local_today()-timedelta(days=6),key="report_start")
+                with rc2: r_end = st.date_input("종료일",value=local_today(),key="report_end")
+                try: report = svc.health_report(st.session_state.user,r_start,r_end)
+                except ValueError as e: st.error(str(e))
+                else:
+                    st.caption("권장량 대비 평균 섭취(%), 급수 부족 최장 연속 일수, 과식(권장량+간식 상한 초과) 일수")
+                    st.dataframe(report["summary"][["name","days_fed","food_pct","days_watered","water_pct",
+                                                    "water_low_max","overfed_days"]])
+                    anomalies = report["anomalies"]
+                    if anomalies.empty: st.success("기간 중 이상 징후가 없습니다.")
+                    else:
+                        names = report["summary"]["name"]
+                        for a in anomalies.itertuples():
+                            if a.type=="water_low":
+                                st.warning(f"{a.date} · {names.get(a.pet_id,'?')}: {svc.analytics.low_water_days}일 연속 급수 부족 ({a.value:.0f}/{a.target} ml)")
+                            else:
+                                st.warning(f"{a.date} · {names.get(a.pet_id,'?')}: 과식 ({a.value:.0f} g > {a.target} g)")
+
     # ===== 반려동물 프로필 =====
-    with tab_profile:
+    with tab_profile, instrument.span("tab:반려동물 프로필"):
         st.header("🐶 반려동물 프로필")
         st.subheader("등록하기")
         with st.form("pet_form",clear_on_submit=True):
             name = st.text_input("이름*")
-            species = st.selectbox("종*",["개","고양이","기타"],index=0)
+            species = st.selectbox("종*",SPECIES,index=0)
             breed = st.text_input("품종 (선택)")
             birth = st.date_input("생일 (선택)",value=None)
             weight = st.number_input("체중(kg)",min_value=0.0,step=0.1,value=0.0)
@@ -185,52 +254,80 @@ else:
             photo_upload = st.file_uploader("프로필 사진 (선택)",type=["jpg","png","jpeg"])
             submitted = st.form_submit_button("추가")
             if submitted:
-                photo_path = ""
-                if photo_upload:
-                    photo_filename = f"{uuid.uuid4()}_{photo_upload.name}"
-                    photo_path = os.path.join(PHOTO_DIR,photo_filename)
-                    with open(photo_path,"wb") as f: f.write(photo_upload.read())
-                new_pet = {"id":str(uuid.uuid4()),"name":name.strip(),"species":species,
-                           "breed":breed.strip(),"birth":birth.isoformat() if birth else "",
-                           "weight_kg":float(weight),"notes":notes.strip(),"photo_path":photo_path}
-                if not new_pet["name"]:
-                    st.error("이름은 필수입니다.")
+                new_pet = {"name":name,"species":species,"breed":breed.strip(),
+                           "birth":birth.isoformat() if birth else "","weight_kg":weight,
+                           "notes":notes.strip(),"photo_id":store_upload(photo_upload) if photo_upload else ""}
+                try:
+                    records = svc.save_pet(st.session_state.user,new_pet)
+                except ValueError as e:
+                    st.error(str(e))
                 else:
-                    st.session_state.pets.append(new_pet)
-                    save_json(PET_FILE,st.session_state.pets)
-                    st.success(f"{new_pet['name']} 등록 완료")
+                    commit("pets",records)
+                    st.success(f"{records[-1]['name']} 등록 완료")
 
         st.subheader("목록/편집")
-        if not st.session_state.pets: st.info("등록된 반려동물이 없습니다.")
+        if pet_edits():
+            # 저장/취소를 목록보다 먼저 처리해 같은 실행에서 바로 반영된 목록을 그린다
+            n = len(pet_edits())
+            sc1,sc2,sc3 = st.columns([2,1,1])
+            with sc1: st.info(f"저장하지 않은 변경 {n}건")
+            with sc2:
+                if st.button(f"💾 변경 저장 ({n}건)",type="primary"):
+                    try: st.success(f"{flush_pet_edits()}건 저장 완료")
+                    except ValueError as e: st.error(str(e))
+            with sc3:
+                if st.button("변경 취소"): discard_pet_edits()
+        pets,edits = data("pets"),pet_edits()
+        if not pets: st.info("등록된 반려동물이 없습니다.")
         else:
-            for p in st.session_state.pets:
-                with st.expander(f"{p['name']} ({p['species']})"):
-                    colA,colB = st.columns([2,1])
-                    with colA:
-                        p["name"] = st.text_input("이름",value=p["name"],key=f"name_{p['id']}")
-                        p["species"] = st.selectbox("종",["개","고양이","기타"],
-                            index=["개","고양이","기타"].index(p["species"]) if p["species"] in ["개","고양이","기타"] else 2,
-                            key=f"species_{p['id']}")
-                        p["breed"] = st.text_input("품종",value=p.get("breed",""),key=f"breed_{p['id']}")
-                        p["birth"] = st.text_input("생일(YYYY-MM-DD)",value=p.get("birth",""),key=f"birth_{p['id']}")
-                        p["weight_kg"] = st.number_input("체중(kg)",value=float(p.get("weight_kg",0.0)),
-                            step=0.1,key=f"weight_{p['id']}")
-                        p["notes"] = st.text_area("메모",value=p.get("notes",""),key=f"notes_{p['id']}")
-                        new_photo = st.file_uploader("프로필 사진 변경",type=["jpg","png","jpeg"],key=f"photo_{p['id']}")
-                        if new_photo:
-                            photo_filename = f"{uuid.uuid4()}_{new_photo.name}"
-                            photo_path = os.path.join(PHOTO_DIR,photo_filename)
-                            with open(photo_path,"wb") as f: f.write(new_photo.read())
-                            p["photo_path"] = photo_path
-                    with colB:
-                        if st.button("저장",key=f"save_{p['id']}"):
-                            save_json(PET_FILE,st.session_state.pets); st.success("저장 완료")
-                        if st.button("삭제",key=f"del_{p['id']}"):
-                            st.session_state.pets = [x for x in st.session_state.pets if x["id"]!=p["id"]]
-                            save_json(PET_FILE,st.session_state.pets); st.warning("삭제했습니다.")
+            lc1,lc2 = st.columns([3,1])
+            with lc1: pq = st.text_input("검색 (이름/품종/종)",key="pet_q").strip().casefold()
+            matched = [p for p in pets if pq in f"{p['name']} {p.get('breed','')} {p['species']}".casefold()]
+            pages = max(1,(len(matched)-1)//PET_PAGE+1)
+            with lc2: page = min(pages,st.number_input("페이지",min_value=1,value=1,step=1,key="pet_page"))
+            shown = {p["id"]:p for p in matched[(page-1)*PET_PAGE:page*PET_PAGE]}
+            if not shown: st.info("검색 결과가 없습니다.")
+            else:
+                st.caption(f"{len(matched)}마리 중 {(page-1)*PET_PAGE+1}~{(page-1)*PET_PAGE+len(shown)} · {page}/{pages} 페이지")
+                def pet_label(pid):
+                    p = shown[pid]
+                    if pid in edits and edits[pid] is None: return f"🗑️ {p['name']} ({p['species']}) · 삭제 예정"
+                    e = edits.get(pid,p)
+                    return f"{'✏️ ' if pid in edits else ''}{e['name']} ({e['species']}) · {e.get('weight_kg',0)} kg"
+                sel = st.radio("편집할 반려동물",list(shown),format_func=pet_label,key="pet_sel")
+                if sel in edits and edits[sel] is None:
+                    if st.button("삭제 취소",key=f"undel_{sel}"): del edits[sel]; st.rerun()
+                else:
+                    # 선택한 한 마리만 편집 위젯을 그린다. 폼 안의 입력은 '변경 담기' 전까지 재실행을 일으키지 않는다.
+                    p = edits.get(sel) or shown[sel]
+                    with st.form(f"pet_edit_{sel}"):
+                        colA,colB = st.columns([2,1])
+                        with colA:
+                            e_name = st.text_input("이름",value=p["name"],key=f"name_{sel}")
+                            e_species = st.selectbox("종",SPECIES,
+                                index=SPECIES.index(p["species"]) if p["species"] in SPECIES else 2,key=f"species_{sel}")
+                            e_breed = st.text_input("품종",value=p.get("breed",""),key=f"breed_{sel}")
+                            e_birth = st.text_input("생일(YYYY-MM-DD)",value=p.get("birth",""),key=f"birth_{sel}")
+                            e_weight = st.number_input("체중(kg)",value=float(p.get("weight_kg",0.0) or 0),
+                                step=0.1,key=f"weight_{sel}")
+                            e_notes = st.text_area("메모",value=p.get("notes",""),key=f"notes_{sel}")
+                            e_photo = st.file_uploader("프로필 사진 변경",type=["jpg","png","jpeg"],key=f"photo_{sel}")
+                        with colB:
+                            stage = st.form_submit_button("변경 담기")
+                            drop = st.form_submit_button("삭제 표시")
+                    if stage:
+                        new = dict(p,name=e_name.strip(),species=e_species,breed=e_breed.strip(),
+                                   birth=e_birth.strip(),weight_kg=float(e_weight),notes=e_notes.strip())
+                        if e_photo:
+                            key = store_upload(e_photo)
+                            if key!=new.get("photo_id"): new["photo_id"],new["photo_path"] = key,""
+                        if not new["name"]: st.error("이름은 필수입니다.")
+                        elif new==shown[sel]: edits.pop(sel,None); st.rerun()
+                        else: edits[sel] = new; st.rerun()
+                    if drop: edits[sel] = None; st.rerun()
 
     # ===== 사료/급수 기록 =====
-    with tab_feed:
+    with tab_feed, instrument.span("tab:사료/급수 기록"):
         st.header("🍽️ 사료/급수 기록")
         pet = pet_selector(key="feed_pet_selector")
         if pet:
@@ -244,21 +341,26 @@ else:
                     water_memo = st.text_input("물 메모(선택)")
                 submitted = st.form_submit_button("💾 오늘 기록 저장")
                 if submitted:
+                    # 바뀐 로그만 한 행씩 추가 (전체 CSV 재작성 없음)
                     today = local_today().isoformat()
-                    if food_g>0:
-                        new_food = pd.DataFrame({"log_id":[str(uuid.uuid4())],"pet_id":[pet["id"]],
-                                                 "date":[today],"amount_g":[int(food_g)],"memo":[food_memo.strip()]})
-                        feed_df = pd.concat([feed_df,new_food],ignore_index=True)
-                    if water_ml>0:
-                        new_water = pd.DataFrame({"log_id":[str(uuid.uuid4())],"pet_id":[pet["id"]],
-                                                  "date":[today],"amount_ml":[int(water_ml)],"memo":[water_memo.strip()]})
-                        water_df = pd.concat([water_df,new_water],ignore_index=True)
-                    save_csv(FEED_FILE,feed_df); save_csv(WATER_FILE,water_df)
+                    entries = [{"pet_id":pet["id"],"kind":kind,"amount":amount,"date":today,"memo":memo}
+                               for kind,amount,memo in (("feed",food_g,food_memo),("water",water_ml,water_memo))
+                               if amount>0]
+                    svc.log_intake(st.session_state.user,entries)
                     st.success("✅ 오늘 기록이 저장되었습니다.")
 
     # ===== 복약 알림 =====
-    with tab_med:
+    with tab_med, instrument.span("tab:복약 알림"):
         st.header("💊 복약 스케줄")
+        now = local_now()
+        reminders = reminder_queue(now)
+        if len(reminders):
+            pet_names = {p["id"]:p["name"] for p in data("pets")}
+            def dose_label(dt,m): return f"{dt:%m/%d %H:%M} · {pet_names.get(m.pet_id,'?')} · {m.drug} {m.dose}{m.unit}"
+            for dt,m in reminders.due(now): st.warning(f"⏰ 지금 복용: {dose_label(dt,m)}")
+            upcoming_doses = reminders.next_doses(5)
+            if upcoming_doses:
+                st.caption("다음 복용: " + " / ".join(dose_label(dt,m) for dt,m in upcoming_doses))
         pet = pet_selector(key="med_pet_selector")
         if pet:
             st.subheader("새 복약 스케줄 추가")
@@ -273,21 +375,17 @@ else:
                 notes = st.text_area("메모")
                 ok = st.form_submit_button("추가")
                 if ok:
-                    rec = {"id":str(uuid.uuid4()),"pet_id":pet["id"],"drug":drug.strip(),
-                           "dose":dose.strip(),"unit":unit.strip(),
-                           "times":[t.strip() for t in times_str.split(",") if t.strip()],
-                           "start":start.isoformat() if start else "",
-                           "end":end.isoformat() if end else "",
-                           "notes":notes.strip()}
-                    if not rec["drug"] or not rec["times"]:
-                        st.error("약 이름과 시간은 필수입니다.")
+                    try:
+                        records = svc.add_med(st.session_state.user,pet["id"],drug,times_str,
+                                              dose,unit,start,end,notes)
+                    except ValueError as e:
+                        st.error(str(e))
                     else:
-                        st.session_state.med_schedule.append(rec)
-                        save_json(MED_FILE,st.session_state.med_schedule)
+                        commit("med_schedule",records)
                         st.success("추가 완료")
 
             st.subheader("스케줄 목록/삭제")
-            meds = [m for m in st.session_state.med_schedule if m["pet_id"]==pet["id"]]
+            meds = [m for m in data("med_schedule") if m["pet_id"]==pet["id"]]
             if not meds: st.info("등록된 스케줄이 없습니다.")
             else:
                 for m in meds:
@@ -295,13 +393,15 @@ else:
                         st.write(f"기간: {m.get('start','')} ~ {m.get('end','') or '지속'}")
                         if m.get("notes"): st.caption(m["notes"])
                         if st.button("이 스케줄 삭제",key=f"med_del_{m['id']}"):
-                            st.session_state.med_schedule = [x for x in st.session_state.med_schedule if x["id"]!=m["id"]]
-                            save_json(MED_FILE,st.session_state.med_schedule)
+                            commit("med_schedule",svc.delete_med(st.session_state.user,m["id"]))
                             st.warning("삭제했습니다.")
-            st.info("알림은 앱 내 표시만 제공됩니다. 시스템 알림이 필요하면 iCal 내보내기/캘린더 연동을 추후 추가하세요.")
+            st.info("알림은 앱 내 표시만 제공됩니다. 휴대폰/PC 알림이 필요하면 iCal 파일을 캘린더 앱으로 가져오세요.")
+            st.download_button("📅 iCal 내보내기 (전체 스케줄)",
+                               "".join(ical_lines(data("med_schedule"),{p["id"]:p["name"] for p in data("pets")})),
+                               file_name="petmate_meds.ics",mime="text/calendar")
 
     # ===== 병원 일정 =====
-    with tab_hosp:
+    with tab_hosp, instrument.span("tab:병원 일정"):
         st.header("🏥 병원 일정 관리")
         pet = pet_selector(key="hosp_pet_selector")
         if pet:
@@ -315,42 +415,46 @@ else:
                 notes = st.text_area("메모")
                 ok = st.form_submit_button("추가")
                 if ok:
-                    dt_iso = datetime.combine(d,t).isoformat()
-                    rec = {"id":str(uuid.uuid4()),"pet_id":pet["id"],"title":title.strip(),
-                           "dt":dt_iso,"place":place.strip(),"notes":notes.strip()}
-                    if not rec["title"]: st.error("제목은 필수입니다.")
+                    try:
+                        # 일시는 서비스가 쓸 때 한 번만 KST로 정규화
+                        save_event({"pet_id":pet["id"],"title":title,"dt":datetime.combine(d,t),
+                                    "place":place,"notes":notes})
+                    except ValueError as e:
+                        st.error(str(e))
                     else:
-                        st.session_state.hospital_events.append(rec)
-                        save_json(HOSP_FILE,st.session_state.hospital_events)
                         st.success("추가 완료")
 
-            st.subheader("다가오는 일정")
-            upcoming = [e for e in st.session_state.hospital_events if e["pet_id"]==pet["id"]]
-            upcoming = sorted(upcoming,key=lambda x: x["dt"])
-            if not upcoming: st.info("등록된 일정이 없습니다.")
+            st.subheader("일정 보기")
+            events = event_index()
+            now = datetime.now(KST)
+            vc1,vc2 = st.columns([3,1])
+            views = {"다가오는 7일":"upcoming","이번 달":"month","예정 전체":"future","지난 일정":"past"}
+            with vc1: view = st.radio("기간",list(views),horizontal=True,key="hosp_view")
+            with vc2: page = st.number_input("페이지",min_value=1,value=1,step=1,key="hosp_page")-1
+            shown,total = svc.events(st.session_state.user,pet["id"],views[view],page=page,now=now,index=events)
+            if not total: st.info("해당 기간에 일정이 없습니다.")
+            elif not shown: st.info(f"마지막 페이지를 넘었습니다 (총 {total}건).")
             else:
-                for e in upcoming:
-                    dt_kst = datetime.fromisoformat(e["dt"]).astimezone(tz.gettz("Asia/Seoul")).strftime("%Y-%m-%d %H:%M")
-                    st.write(f"**{dt_kst}** · {e['title']} @ {e.get('place','')}")
+                st.caption(f"총 {total}건 · {page+1}/{(total-1)//10+1} 페이지")
+                for dt_kst,e in shown:
+                    st.write(f"**{dt_kst:%Y-%m-%d %H:%M}** · {e['title']} @ {e.get('place','')}")
                     if e.get("notes"): st.caption(e["notes"])
                     if st.button("삭제",key=f"evt_del_{e['id']}"):
-                        st.session_state.hospital_events = [x for x in st.session_state.hospital_events if x["id"]!=e["id"]]
-                        save_json(HOSP_FILE,st.session_state.hospital_events)
+                        save_event(delete_id=e["id"])
                         st.warning("삭제했습니다.")
 
     # ===== 위험 정보 검색 =====
-    with tab_risk:
+    with tab_risk, instrument.span("tab:위험 정보 검색"):
         st.header("⚠️ 위험 음식/식물/물품 검색")
         q = st.text_input("검색어",placeholder="예: 초콜릿, 양파 …")
 
-        # 🔹 안전장치 추가
-        db = pd.DataFrame(st.session_state.unsafe_db)
-        for col in ["category", "risk"]:
-            if col not in db.columns:
-                db[col] = "기타"   # 기본값
-
-        view = db[db["name"].str.contains(q,case=False,na=False)] if q else db
-        st.dataframe(view.sort_values(["category","risk"]))
+        # 초성(ㅊㅋ)·부분 입력·별칭·설명으로도 찾고, 관련도 순으로 보여 준다
+        idx = svc.unsafe_index()
+        view = idx.search(q,limit=200)
+        db = pd.DataFrame(view,columns=["category","name","risk","why","aliases"])
+        db[["category","risk"]] = db[["category","risk"]].fillna("기타")   # 🔹 안전장치: 기본값
+        st.dataframe(db)
+        if len(view)==200: st.caption(f"전체 {len(idx)}개 중 상위 200개만 표시합니다. 검색어를 더 입력해 보세요.")
 
         with st.expander("항목 추가/수정"):
             st.caption("간단한 내부 DB입니다. 필요 시 직접 업데이트하세요.")
@@ -358,38 +462,100 @@ else:
                 cat = st.selectbox("분류",["음식","식물","물품"])
                 nm = st.text_input("이름")
                 rk = st.selectbox("위험도",["주의","중간-고위험","고위험"])
+                aliases = st.text_input("별칭 (선택, 콤마로 구분)",placeholder="예: chocolate, 카카오")
                 why = st.text_area("이유/설명")
                 ok = st.form_submit_button("추가")
                 if ok:
-                    st.session_state.unsafe_db.append({
-                        "category":cat,
-                        "name":nm.strip(),
-                        "risk":rk,
-                        "why":why.strip()
-                    })
-                    save_json(UNSAFE_FILE,st.session_state.unsafe_db)
-                    st.success("추가했습니다.")
+                    try: svc.add_unsafe(cat,nm,rk,why,aliases)   # 검색 인덱스에도 한 건만 반영
+                    except ValueError as e: st.error(str(e))
+                    else: st.success("추가했습니다.")
 
     # ===== 데이터 관리 =====
-    with tab_data:
+    with tab_data, instrument.span("tab:데이터 관리"):
         st.header("🗂️ 데이터 관리/백업")
-        c1,c2 = st.columns(2)
+        my_pet_ids = [p["id"] for p in data("pets")]
+
+        st.subheader("로그 대량 가져오기")
+        st.caption("급식기·스마트 물그릇·병원 시스템에서 내보낸 CSV/JSONL 파일. "
+                   "pet_id, date, amount_g(사료) 또는 amount_ml(급수), memo 열을 사용하며 중복 행은 건너뜁니다.")
+        ic1,ic2 = st.columns([1,3])
+        with ic1: imp_kind = st.radio("종류",["feed","water"],format_func={"feed":"사료","water":"급수"}.get)
+        with ic2: imp_file = st.file_uploader("로그 파일",type=["csv","jsonl"],key="bulk_import")
+        if imp_file and st.button("가져오기"):
+            bar = st.progress(0.0,text="가져오는 중…")
+            size = max(1,imp_file.size)
+            report = import_logs(svc.logs,imp_kind,imp_file,
+                                 fmt="jsonl" if imp_file.name.lower().endswith(".jsonl") else "csv",
+                                 pet_ids=my_pet_ids,
+                                 progress=lambda n,read: bar.progress(min(1.0,read/size),text=f"{n:,}행 처리"))
+            bar.progress(1.0,text="완료")
+            st.success(f"{report['rows']:,}행 중 {report['inserted']:,}건 추가 · 중복 {report['duplicates']:,}건 · 오류 {report['invalid']:,}건")
+            for line,why in report["errors"]: st.caption(f"{line}행: {why}")
+
+        st.subheader("백업 내보내기")
+        if st.button("백업 파일 만들기 (zip)"):
+            backup = io.BytesIO()   # 로그는 저장소에서 배치로 읽어 바로 압축하므로 버퍼에는 압축본만 남는다
+            export_archive(backup,svc.logs,
+                           {n:data(n) for n in SESSION_DATA} | {"unsafe_db":svc.unsafe.load()},
+                           pet_ids=my_pet_ids)
+            st.download_button("⬇️ 백업 다운로드",backup.getvalue(),mime="application/zip",
+                               file_name=f"petmate_backup_{local_today().isoformat()}.zip")
+
+        st.subheader("API 키")
+        st.caption("급식기·자동화 도구가 HTTP API(python -m petmate.api)로 내 데이터에 접근할 때 쓰는 키입니다. "
+                   "새로 발급하면 이전 키는 바로 쓸 수 없게 됩니다.")
+        if st.button("새 API 키 발급"):
+            try:
+                st.code(svc.auth.issue_api_key(st.session_state.user),language=None)
+                st.warning("이 키는 지금 한 번만 표시됩니다. 안전한 곳에 보관하세요.")
+            except ValueError as e:
+                st.error(str(e))
+
+        st.subheader("초기화")
+        c1,c2,c3 = st.columns(3)
         with c1:
             if st.button("사료/급수 로그 초기화"):
-                save_csv(FEED_FILE,pd.DataFrame(columns=feed_cols))
-                save_csv(WATER_FILE,pd.DataFrame(columns=water_cols))
+                svc.clear_logs(st.session_state.user)   # 내 반려동물의 로그만
                 st.success("초기화 완료")
         with c2:
-            if st.button("프로필/복약/일정/DB 초기화"):
-                save_json(PET_FILE,[]); save_json(MED_FILE,[])
-                save_json(HOSP_FILE,[]); save_json(UNSAFE_FILE,[])
+            if st.button("프로필/복약/일정 초기화"):
+                svc.reset_owner(st.session_state.user)   # 내 파티션만
+                for n in SESSION_DATA: commit(n,[])
+                st.success("초기화 완료")
+        with c3:
+            # 위험 정보 DB는 모든 사용자가 함께 쓰므로 따로, 확인을 받은 뒤에만 비운다
+            shared_ok = st.checkbox("모든 사용자의 위험 정보 DB가 지워지는 것을 확인했습니다",key="unsafe_reset_ok")
+            if st.button("위험 정보 DB 초기화",disabled=not shared_ok):
+                svc.reset_unsafe()
                 st.success("초기화 완료")
 
         if st.button("👥 계정 삭제"):
-            save_json(USER_FILE, [])       # users.json 파일 비우기
+            svc.users.clear()              # 계정 파일 비우기
             st.session_state.user = None   # 혹시 로그인 중이면 로그아웃 처리
+            reset_session_data()
             st.success("✅ 모든 회원 계정이 삭제되었습니다.")
 
+# ===== 성능 기록 (PROFILE일 때만) =====
+if PROFILE:
+    rec = instrument.end()
+    perf = st.session_state.setdefault("_perf",[])
+    perf.append(rec.as_dict()); del perf[:-200]   # 최근 200회만
+    with st.expander("🛠️ 성능 기록 (이번 재실행)"):
+        io_r,io_w = rec.counts.get("io:read_bytes",0),rec.counts.get("io:write_bytes",0)
+        m1,m2,m3,m4,m5 = st.columns(5)
+        m1.metric("전체",f"{rec.total_ms:.1f} ms")
+        m2.metric("데이터 로드",f"{sum(v for k,v in rec.spans.items() if k.startswith('load:')):.1f} ms")
+        m3.metric("JSON 읽기/쓰기",f"{io_r/1024:.1f} / {io_w/1024:.1f} KB",help="JSON 데이터 파일만 (SQLite 로그 제외)")
+        m4.metric("SQLite 변경 행",rec.counts.get("sqlite:rows",0),help=f"연결 {rec.counts.get('sqlite',0)}회")
+        m5.metric("캐시 적중",rec.counts.get("cache:hit",0))
+        st.dataframe(pd.DataFrame(sorted(rec.spans.items(),key=lambda kv:-kv[1]),columns=["구간","ms"]),
+                     hide_index=True)
+        st.caption(f"최근 {len(perf)}회 재실행 전체 시간(ms)")
+        st.line_chart(pd.DataFrame({"total_ms":[r["total_ms"] for r in perf]}))
+        ec1,ec2 = st.columns(2)
+        with ec1: st.download_button("JSON 내보내기",instrument.export(perf),file_name="petmate_perf.json",mime="application/json")
+        with ec2: st.download_button("CSV 내보내기",instrument.export(perf,"csv"),file_name="petmate_perf.csv",mime="text/csv")
+
 # ===== 푸터 =====
 st.divider()
 st.caption("© 2025 PetMate • 학습/포트폴리오용 샘플. 실제 의료 조언은 수의사와 상담하세요.")
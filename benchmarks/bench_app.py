@@ -0,0 +1,151 @@
+# 앱 핫패스 벤치마크: 합성 데이터로 재실행 한 번에 드는 주요 경로를 헤드리스로 잰다
+#   python benchmarks/bench_app.py --users 20 --pets 10 --days 90 --unsafe 5000
+#   python benchmarks/bench_app.py --json bench.json          # 결과 저장 (회귀 비교용)
+#   python benchmarks/bench_app.py --apptest                  # Streamlit AppTest로 실제 재실행 시간도
+# 'legacy' 항목은 예전 방식(CSV 전체 읽기/필터/재작성, DataFrame 부분 문자열 검색)을 같은 데이터로 재현한 것이다.
+import os, sys, json, time, uuid, random, argparse, tempfile, statistics
+from datetime import date, datetime, timedelta
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from petmate.datacache import file_cache
+from petmate.logstore import LOG_COLS
+from petmate.service import PetMateService
+
+SPECIES = ("개", "고양이", "기타")
+WORDS = ("초콜릿", "포도", "양파", "마늘", "자일리톨", "아보카도", "백합", "튤립", "진달래", "건전지",
+         "chocolate", "grape", "onion", "lily", "카카오", "커피", "알코올", "마카다미아", "은행", "복숭아씨")
+
+def make_dataset(root, users, pets, days, meds, events, unsafe, seed=0):
+    """root(DATA_DIR)에 합성 데이터를 만들고 (서비스, 사용자 목록, 예전 방식 CSV 경로)를 반환"""
+    rnd = random.Random(seed)
+    svc = PetMateService(root)
+    today = date.today()
+    owners = [f"user{u}" for u in range(users)]
+    logs = {k: [] for k in LOG_COLS}
+    for owner in owners:
+        st = svc.stores(owner)
+        ps = [{"id": str(uuid.uuid4()), "name": f"{owner}-pet{i}", "species": rnd.choice(SPECIES), "breed": "",
+               "birth": "", "weight_kg": round(rnd.uniform(1, 35), 1), "notes": "", "photo_path": "", "photo_id": ""}
+              for i in range(pets)]
+        st["pets"].replace_all(ps)
+        st["med_schedule"].replace_all([
+            {"id": str(uuid.uuid4()), "pet_id": p["id"], "drug": f"drug{j}", "dose": "5", "unit": "mg",
+             "times": [f"{rnd.randrange(6, 23):02d}:00"], "start": (today - timedelta(days=30)).isoformat(), "end": "",
+             "notes": ""} for p in ps for j in range(meds)])
+        st["hospital_events"].replace_all([
+            {"id": str(uuid.uuid4()), "pet_id": p["id"], "title": "검진", "place": "", "notes": "",
+             "dt": (datetime.combine(today, datetime.min.time()) + timedelta(days=rnd.randint(-365, 365), hours=10))
+                   .isoformat() + "+09:00"} for p in ps for _ in range(events)])
+        for p in ps:
+            for d in range(days):
+                day = (today - timedelta(days=d)).isoformat()
+                for _ in range(rnd.randint(1, 3)):
+                    logs["feed"].append({"log_id": str(uuid.uuid4()), "pet_id": p["id"], "date": day,
+                                         "amount_g": rnd.randint(10, 200), "memo": ""})
+                logs["water"].append({"log_id": str(uuid.uuid4()), "pet_id": p["id"], "date": day,
+                                      "amount_ml": rnd.randint(50, 900), "memo": ""})
+    legacy = {}
+    for kind, rows in logs.items():
+        for i in range(0, len(rows), 5000): svc.logs.append(kind, rows[i:i + 5000])
+        legacy[kind] = os.path.join(root, f"legacy_{kind}_log.csv")   # 예전 방식 비교용 (앱은 읽지 않음)
+        pd.DataFrame(rows, columns=LOG_COLS[kind]).to_csv(legacy[kind], index=False)
+    svc.unsafe.replace_all([{"id": str(i), "category": rnd.choice(("음식", "식물", "물품")),
+                             "name": f"{rnd.choice(WORDS)}{rnd.choice(WORDS)}{i}", "risk": rnd.choice(("주의", "고위험")),
+                             "why": f"{rnd.choice(WORDS)} 성분 {rnd.choice(WORDS)}", "aliases": []}
+                            for i in range(unsafe)])
+    return svc, owners, legacy
+
+def timeit(fn, reps, setup=None):
+    ts = []
+    for _ in range(reps):
+        if setup: setup()
+        t = time.perf_counter(); fn(); ts.append(time.perf_counter() - t)
+    return statistics.median(ts) * 1e3
+
+def run_cases(svc, owner, legacy, reps):
+    pets = svc.pets(owner)
+    pet = pets[0]
+    today = date.today().isoformat()
+    pets_path = svc.stores(owner)["pets"].path
+    read_csv = lambda path: file_cache.get(path, pd.read_csv, copier=lambda df: df.copy())
+    feed_df = read_csv(legacy["feed"])
+    cold = lambda path: (lambda: file_cache.invalidate(path))
+    n = [0]
+    def submit_new():
+        n[0] += 1
+        svc.log_intake(owner, [{"pet_id": pet["id"], "kind": "feed", "amount": 50, "log_id": f"bench-{n[0]}"}])
+    def submit_legacy():
+        df = read_csv(legacy["feed"])
+        df.loc[len(df)] = [str(uuid.uuid4()), pet["id"], today, 50, ""]
+        df.to_csv(legacy["feed"], index=False); file_cache.put(legacy["feed"], df, copier=lambda d: d.copy())
+    svc.health_report(owner)   # 분석 캐시 예열 (cold는 따로 잰다)
+    return {
+        "load_json pets (cold)": timeit(lambda: svc.pets(owner), reps, cold(pets_path)),
+        "load_json pets (cached)": timeit(lambda: svc.pets(owner), reps),
+        "load_csv feed legacy (cold)": timeit(lambda: read_csv(legacy["feed"]), max(3, reps // 10), cold(legacy["feed"])),
+        "load_csv feed legacy (cached)": timeit(lambda: read_csv(legacy["feed"]), reps),
+        "dashboard intake legacy": timeit(lambda: feed_df[(feed_df["pet_id"] == pet["id"]) &
+                                                          (feed_df["date"] == today)]["amount_g"].sum(), reps),
+        "dashboard intake": timeit(lambda: svc.intake(pet, today), reps),
+        "dashboard summary (all pets)": timeit(lambda: svc.dashboard_summary(owner, today), reps),
+        "risk search legacy": timeit(lambda: (lambda db: db[db["name"].str.contains("초콜", case=False, na=False)])(
+                                         pd.DataFrame(svc.unsafe.load())), reps),
+        "risk search": timeit(lambda: svc.search_unsafe("초콜", limit=200), reps),
+        "risk search chosung": timeit(lambda: svc.search_unsafe("ㅊㅋ", limit=200), reps),
+        "log submit legacy save_csv": timeit(submit_legacy, max(3, reps // 10)),
+        "log submit": timeit(submit_new, reps),
+        "weekly report (cached)": timeit(lambda: svc.health_report(owner), reps),
+        "next doses": timeit(lambda: svc.next_doses(owner, 5), reps),
+        "events upcoming": timeit(lambda: svc.events(owner, pet["id"]), reps),
+    }
+
+def run_apptest(root, owner, reps):
+    """Streamlit AppTest로 로그인 상태의 전체 재실행 시간 (streamlit이 있을 때만)"""
+    from streamlit.testing.v1 import AppTest
+    app = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app.py")
+    cwd = os.getcwd()
+    os.chdir(os.path.dirname(root))   # app.py의 DATA_DIR = "data"
+    try:
+        at = AppTest.from_file(app, default_timeout=60)
+        at.session_state["user"] = owner
+        at.run()   # 첫 실행은 서비스/캐시 준비 포함
+        if at.exception: raise RuntimeError(at.exception[0].message)
+        def rerun():
+            # AppTest는 format_func가 있는 라디오의 현재 값을 되돌려 보내지 못하므로 표시 문자열로 지정
+            for r in at.radio:
+                try: r.index
+                except ValueError: r.set_value(r.options[0])
+            at.run()
+        return {"apptest rerun": timeit(rerun, reps)}
+    finally:
+        os.chdir(cwd)
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--users", type=int, default=10)
+    ap.add_argument("--pets", type=int, default=10, help="사용자당 반려동물 수")
+    ap.add_argument("--days", type=int, default=90, help="반려동물당 로그 일수")
+    ap.add_argument("--meds", type=int, default=2, help="반려동물당 복약 스케줄 수")
+    ap.add_argument("--events", type=int, default=20, help="반려동물당 병원 일정 수")
+    ap.add_argument("--unsafe", type=int, default=2000)
+    ap.add_argument("--reps", type=int, default=50)
+    ap.add_argument("--apptest", action="store_true")
+    ap.add_argument("--json", help="결과를 저장할 JSON 경로")
+    a = ap.parse_args()
+    with tempfile.TemporaryDirectory() as tmp:
+        root = os.path.join(tmp, "data")
+        t = time.perf_counter()
+        svc, owners, legacy = make_dataset(root, a.users, a.pets, a.days, a.meds, a.events, a.unsafe)
+        print(f"dataset: {a.users} users x {a.pets} pets, {svc.logs.count('feed'):,} feed / "
+              f"{svc.logs.count('water'):,} water rows, {a.unsafe:,} unsafe items ({time.perf_counter() - t:.1f}s)")
+        results = run_cases(svc, owners[0], legacy, a.reps)
+        if a.apptest: results.update(run_apptest(root, owners[0], max(3, a.reps // 10)))
+    print(f"{'case':<34} {'median ms':>10}")
+    for k, v in results.items(): print(f"{k:<34} {v:>10.3f}")
+    if a.json:
+        with open(a.json, "w", encoding="utf-8") as f:
+            json.dump({"params": vars(a), "results_ms": results}, f, ensure_ascii=False, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+# JSON 저장소 동시성 스트레스 벤치마크
+#   python benchmarks/bench_concurrency.py --procs 4 --threads 8 --ops 50
+# 여러 프로세스 x 스레드(= Streamlit 세션)가 같은 pets.json에 레코드를 추가/수정/삭제한다.
+# 끝난 뒤 파일이 온전한지, 예상한 레코드가 하나도 빠짐없이 남았는지 확인하고 지연 시간을 보고한다.
+# --naive를 주면 예전 방식(세션 사본 전체를 "w"로 덮어쓰기)으로 같은 부하를 걸어 유실 건수를 비교한다.
+import os, sys, json, time, argparse, tempfile, threading, statistics
+from multiprocessing import Pool
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from petmate.jsonstore import JsonStore, read_json
+
+def _naive_session(path, sid, ops):
+    lat = []
+    for i in range(ops):
+        t = time.perf_counter()
+        try:
+            with open(path, encoding="utf-8") as f: data = json.load(f)
+        except Exception: data = []   # 예전 load_json처럼 잘린 파일은 빈 목록이 된다
+        data.append({"id": f"{sid}-{i}", "name": f"pet{i}", "session": sid})
+        with open(path, "w", encoding="utf-8") as f: json.dump(data, f, ensure_ascii=False, indent=2)
+        lat.append(time.perf_counter() - t)
+    return lat
+
+def _store_session(path, sid, ops):
+    store, lat = JsonStore(path), []
+    for i in range(ops):
+        t = time.perf_counter()
+        rid = f"{sid}-{i}"
+        store.upsert({"id": rid, "name": f"pet{i}", "session": sid})
+        if i % 5 == 4:   # 가끔 수정과 삭제도 섞는다 (삭제한 건 바로 다시 넣어 최종 개수는 유지)
+            store.upsert({"id": rid, "name": f"pet{i}-renamed", "session": sid})
+            store.delete(f"{sid}-{i-1}")
+            store.upsert({"id": f"{sid}-{i-1}", "name": f"pet{i-1}", "session": sid})
+        lat.append(time.perf_counter() - t)
+    return lat
+
+def _proc(args):
+    path, naive, pid, threads, ops = args
+    fn = _naive_session if naive else _store_session
+    results = [None] * threads
+    def run(k): results[k] = fn(path, f"p{pid}t{k}", ops)
+    ts = [threading.Thread(target=run, args=(k,)) for k in range(threads)]
+    for t in ts: t.start()
+    for t in ts: t.join()
+    return [x for r in results for x in r]
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--procs", type=int, default=4)
+    ap.add_argument("--threads", type=int, default=8)
+    ap.add_argument("--ops", type=int, default=50)
+    ap.add_argument("--naive", action="store_true")
+    a = ap.parse_args()
+    with tempfile.TemporaryDirectory() as d:
+        path = os.path.join(d, "pets.json")
+        with open(path, "w", encoding="utf-8") as f: json.dump([], f)
+        t0 = time.perf_counter()
+        with Pool(a.procs) as pool:
+            lat = [x for r in pool.map(_proc, [(path, a.naive, p, a.threads, a.ops) for p in range(a.procs)]) for x in r]
+        wall = time.perf_counter() - t0
+        try:
+            with open(path, encoding="utf-8") as f: final = json.load(f); intact = True
+        except ValueError:
+            final, intact = read_json(path, []), False
+    expected = a.procs * a.threads * a.ops
+    ids = {r["id"] for r in final}
+    lat.sort()
+    print(f"mode={'naive' if a.naive else 'store'} sessions={a.procs*a.threads} ops={len(lat)} wall={wall:.2f}s "
+          f"throughput={len(lat)/wall:.0f} ops/s")
+    print(f"latency p50={statistics.median(lat)*1e3:.2f}ms p99={lat[int(len(lat)*0.99)-1]*1e3:.2f}ms")
+    print(f"file_intact={intact} records={len(ids)}/{expected} lost={expected-len(ids)}")
+    return 0 if intact and len(ids) == expected else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
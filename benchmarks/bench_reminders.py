@@ -0,0 +1,51 @@
+# 복약 알림 큐 벤치마크: 스케줄 수가 늘어도 조회 지연이 일정한지 확인
+#   python benchmarks/bench_reminders.py --sizes 1000 10000 50000
+# next20/add는 스케줄 수와 무관해야 하고, due/tick은 그 시각에 걸린 복용 건수에만 비례한다.
+import os, sys, time, random, argparse, statistics
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from petmate.reminders import ReminderQueue
+
+def make_schedules(n, seed=0):
+    rnd = random.Random(seed)
+    out = []
+    for i in range(n):
+        times = sorted({f"{rnd.randrange(6, 23):02d}:{rnd.choice((0, 15, 30, 45)):02d}" for _ in range(rnd.randint(1, 3))})
+        end = "" if rnd.random() < 0.5 else f"2025-{rnd.randint(4, 12):02d}-{rnd.randint(1, 28):02d}"
+        out.append({"id": f"m{i}", "pet_id": f"p{i % (n // 3 + 1)}", "drug": f"drug{i % 50}", "dose": "5", "unit": "mg",
+                    "times": times, "start": f"2025-{rnd.randint(1, 3):02d}-{rnd.randint(1, 28):02d}", "end": end})
+    return out
+
+def timeit(fn, reps):
+    ts = []
+    for _ in range(reps):
+        t = time.perf_counter(); fn(); ts.append(time.perf_counter() - t)
+    return statistics.median(ts) * 1e6
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 50000])
+    ap.add_argument("--reps", type=int, default=200)
+    a = ap.parse_args()
+    print(f"{'schedules':>10} {'build ms':>9} {'next20 us':>10} {'due us':>8} {'tick us':>8} {'add us':>7}")
+    for n in a.sizes:
+        recs = make_schedules(n)
+        now = datetime(2025, 4, 1, 7, 0)
+        t = time.perf_counter(); q = ReminderQueue(recs, now); build = (time.perf_counter() - t) * 1e3
+        nxt = timeit(lambda: q.next_doses(20), a.reps)
+        due = timeit(lambda: q.due(now), a.reps)
+        # 1분씩 시계를 진행시키며 due() 호출 (Streamlit 재실행 한 번 = 한 틱)
+        clock = [now]
+        def tick():
+            clock[0] += timedelta(minutes=1); q.due(clock[0])
+        tk = timeit(tick, a.reps)
+        k = [0]
+        def add():
+            k[0] += 1
+            q.add({"id": f"new{k[0]}", "pet_id": "p", "drug": "x", "times": ["09:00"], "start": "2025-04-01"})
+        ad = timeit(add, a.reps)
+        print(f"{n:>10} {build:>9.1f} {nxt:>10.1f} {due:>8.1f} {tk:>8.1f} {ad:>7.1f}")
+
+if __name__ == "__main__":
+    main()
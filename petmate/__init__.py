@@ -0,0 +1 @@
+# PetMate 데이터 계층 (Streamlit 없이도 import 가능)
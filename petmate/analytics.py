@@ -0,0 +1,153 @@
+# 영양 분석: 모든 반려동물의 권장량 대비 섭취량을 기간 단위로 한 번에 계산 (NumPy/pandas)
+import threading
+from collections import OrderedDict
+from datetime import date
+import numpy as np
+import pandas as pd
+
+DOGS = ("개", "강아지", "dog")
+WINDOW = 7           # 이동 평균 일수
+LOW_WATER_DAYS = 3   # 급수 부족이 이만큼 이어지면 이상 징후
+CACHE_RANGES = 8     # 캐시해 둘 기간 수
+
+def targets(pets):
+    """반려동물 목록 -> pet_id 인덱스의 권장량 표 (nutrition.recommended_*의 벡터 버전)"""
+    df = pd.DataFrame(list(pets), columns=["id", "name", "species", "weight_kg"]).drop_duplicates("id").set_index("id")
+    w = pd.to_numeric(df["weight_kg"], errors="coerce").fillna(0.0).to_numpy(float)
+    dog = df["species"].fillna("").astype(str).str.lower().isin(DOGS).to_numpy()
+    grams = np.where(w > 0, np.round(np.where(dog, w*30 + 70, w*60) / 3.5), 0)
+    df["weight_kg"] = w
+    df["food_target_g"] = grams.astype(int)
+    df["snack_limit_g"] = np.maximum(0, np.round(grams*0.1)).astype(int)
+    df["water_target_ml"] = np.where(w > 0, np.round(w*60), 0).astype(int)
+    df.index.name = "pet_id"
+    return df
+
+def _rolling_mean(m, window):
+    # 행마다 최근 window일 평균. 기록 없는 날(NaN)은 빼고 평균, 창 안에 기록이 없으면 NaN.
+    vals = np.nan_to_num(m).cumsum(axis=1)
+    cnt = (~np.isnan(m)).cumsum(axis=1)
+    pad = lambda a: np.concatenate([np.zeros((a.shape[0], window), a.dtype), a], axis=1)[:, :-window]
+    s, c = vals - pad(vals), cnt - pad(cnt)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(c > 0, s / c, np.nan)
+
+def _streak(flags):
+    # 행마다 그날까지 True가 이어진 일수 (False에서 0으로 돌아간다)
+    c = flags.cumsum(axis=1)
+    return c - np.maximum.accumulate(np.where(flags, 0, c), axis=1)
+
+class _Block:
+    """한 기간의 섭취량 행렬: 반려동물 × 날짜 (사료 g, 급수 ml). 기록 없는 칸은 NaN."""
+
+    def __init__(self, start, end):
+        self.start, self.days = start, (end - start).days + 1
+        self.rows = {}   # pet_id -> 행 번호
+        self.feed = np.full((0, self.days), np.nan)
+        self.water = np.full((0, self.days), np.nan)
+        self.seq = 0
+
+    def patch(self, totals):
+        """[(kind, pet_id, date, total, n), ...]를 칸 단위로 덮어쓴다 (n=0이면 비움)"""
+        if not totals: return
+        kind, pet, day, total, n = map(np.asarray, zip(*totals))
+        new = [p for p in dict.fromkeys(pet.tolist()) if p not in self.rows]
+        if new:
+            for p in new: self.rows[p] = len(self.rows)
+            grow = np.full((len(new), self.days), np.nan)
+            self.feed, self.water = np.vstack([self.feed, grow]), np.vstack([self.water, grow])
+        r = np.fromiter((self.rows[p] for p in pet.tolist()), int, len(pet))
+        c = (day.astype("datetime64[D]") - np.datetime64(self.start, "D")).astype(int)
+        v = np.where(n.astype(int) > 0, total.astype(float), np.nan)
+        for k, m in (("feed", self.feed), ("water", self.water)):
+            sel = kind == k
+            m[r[sel], c[sel]] = v[sel]
+
+    def take(self, pet_ids):
+        # pet_ids 순서의 행렬 (기록이 한 번도 없는 반려동물은 NaN 행)
+        idx = np.fromiter((self.rows.get(p, -1) for p in pet_ids), int, len(pet_ids))
+        out = []
+        for m in (self.feed, self.water):
+            padded = np.vstack([m, np.full((1, self.days), np.nan)])   # -1 -> 마지막 NaN 행
+            out.append(padded[idx])
+        return out
+
+class NutritionAnalytics:
+    """일별 집계(daily_totals)를 기간별 행렬로 캐시해 두고 권장량과 비교하는 분석기.
+
+    처음 조회한 기간은 한 번의 쿼리로 반려동물 × 날짜 행렬을 만들고, 이후에는
+    집계 테이블의 변경 번호(seq) 이후에 바뀐 칸만 읽어 고친다. 권장량 비교,
+    이동 평균, 이상 징후는 모두 행렬 연산이라 반려동물 수천 마리도 한 번에 처리한다.
+    """
+
+    def __init__(self, log_store, window=WINDOW, low_water_days=LOW_WATER_DAYS):
+        self.logs, self.window, self.low_water_days = log_store, window, low_water_days
+        self._blocks, self._lock = OrderedDict(), threading.Lock()
+
+    def _block(self, start, end):
+        # self._lock 안에서 부른다
+        key = (start, end)
+        b = self._blocks.get(key)
+        seq = self.logs.totals_seq()   # 먼저 읽어 두면 사이에 들어온 변경은 다음에 다시 반영된다
+        if b is None:
+            b = _Block(start, end)
+            b.patch(self.logs.totals_between(start.isoformat(), end.isoformat()))
+            self._blocks[key] = b
+            while len(self._blocks) > CACHE_RANGES: self._blocks.popitem(last=False)
+        elif seq != b.seq:
+            b.patch(self.logs.totals_between(start.isoformat(), end.isoformat(), since=b.seq))
+        self._blocks.move_to_end(key)
+        b.seq = seq
+        return b
+
+    def daily(self, pets, start, end):
+        """반려동물 × 날짜 한 행씩의 DataFrame.
+        열: pet_id, date, eaten_g, drank_ml, *_target, eaten_avg, drank_avg, water_low_days, overfed.
+        기록이 없는 날의 섭취량은 NaN이고 부족/과식 판단에서 빠진다."""
+        start, end = date.fromisoformat(str(start)), date.fromisoformat(str(end))
+        if end < start: raise ValueError("종료일이 시작일보다 빠릅니다.")
+        t = targets(pets)
+        ids = t.index.tolist()
+        with self._lock:
+            b = self._block(start, end)
+            feed, water = b.take(ids)   # 복사본이므로 잠금 밖에서 계산해도 된다
+        food = t["food_target_g"].to_numpy()[:, None]
+        cap = food + t["snack_limit_g"].to_numpy()[:, None]
+        water_t = t["water_target_ml"].to_numpy()[:, None]
+        low = ~np.isnan(water) & (water < water_t) & (water_t > 0)
+        d = len(ids), b.days
+        return pd.DataFrame({
+            "pet_id": np.repeat(ids, b.days),
+            "date": np.tile(pd.date_range(start, periods=b.days).date, len(ids)),
+            "eaten_g": feed.ravel(), "drank_ml": water.ravel(),
+            "food_target_g": np.broadcast_to(food, d).ravel(),
+            "snack_limit_g": np.broadcast_to(t["snack_limit_g"].to_numpy()[:, None], d).ravel(),
+            "water_target_ml": np.broadcast_to(water_t, d).ravel(),
+            "eaten_avg": _rolling_mean(feed, self.window).ravel(),
+            "drank_avg": _rolling_mean(water, self.window).ravel(),
+            "water_low_days": _streak(low).ravel(),
+            "overfed": (~np.isnan(feed) & (feed > cap) & (food > 0)).ravel(),
+        })
+
+    def report(self, pets, start, end):
+        """기간 요약. 반환: {"daily": daily(), "summary": 반려동물별 표, "anomalies": 이상 징후 목록 표}"""
+        pets = list(pets)
+        daily = self.daily(pets, start, end)
+        g = daily.groupby("pet_id", sort=False)
+        summary = g.agg(days_fed=("eaten_g", "count"), days_watered=("drank_ml", "count"),
+                        eaten_mean=("eaten_g", "mean"), drank_mean=("drank_ml", "mean"),
+                        food_target_g=("food_target_g", "first"), water_target_ml=("water_target_ml", "first"),
+                        water_low_max=("water_low_days", "max"), overfed_days=("overfed", "sum"))
+        with np.errstate(invalid="ignore", divide="ignore"):
+            summary["food_pct"] = (summary["eaten_mean"] / summary["food_target_g"].replace(0, np.nan) * 100).round(1)
+            summary["water_pct"] = (summary["drank_mean"] / summary["water_target_ml"].replace(0, np.nan) * 100).round(1)
+        names = targets(pets)["name"]
+        summary.insert(0, "name", names.reindex(summary.index))
+        # 급수 부족은 연속 일수가 기준에 처음 닿은 날 한 번만, 과식은 그날마다
+        low = daily[daily["water_low_days"] == self.low_water_days].assign(
+            type="water_low", value=lambda x: x["drank_ml"], target=lambda x: x["water_target_ml"])
+        over = daily[daily["overfed"]].assign(
+            type="overfed", value=lambda x: x["eaten_g"], target=lambda x: x["food_target_g"] + x["snack_limit_g"])
+        anomalies = pd.concat([low, over])[["pet_id", "date", "type", "value", "target"]]
+        anomalies = anomalies.sort_values(["date", "pet_id"], kind="stable").reset_index(drop=True)
+        return {"daily": daily, "summary": summary, "anomalies": anomalies}
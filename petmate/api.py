@@ -0,0 +1,177 @@
+# PetMate HTTP/JSON API: 표준 라이브러리 asyncio 서버 (급식기 등 기기/자동화용)
+#   python -m petmate.api --port 8600 --data-dir data
+#   python -m petmate.api --issue-key <아이디>                  # 그 계정의 API 키 발급 (앱 '데이터 관리' 탭에서도)
+# 인증: /health 외에는 "Authorization: Bearer <API 키>" 필요. 키는 계정마다 따로이고 자기 owner 경로만 열린다.
+import os, re, json, asyncio, argparse
+from datetime import date, datetime
+from urllib.parse import urlsplit, parse_qs, unquote
+from .service import PetMateService
+
+MAX_BODY = 10 * 1024 * 1024
+PUBLIC = ("/health",)
+REASONS = {200: "OK", 400: "Bad Request", 401: "Unauthorized", 403: "Forbidden", 404: "Not Found",
+           405: "Method Not Allowed", 413: "Payload Too Large", 500: "Internal Server Error"}
+
+def _jsonable(v):
+    if isinstance(v, (datetime, date)): return v.isoformat()
+    if hasattr(v, "_asdict"): return v._asdict()   # reminders.Schedule
+    raise TypeError(f"JSON으로 바꿀 수 없는 값: {type(v).__name__}")
+
+def _rows(df):
+    # DataFrame -> 레코드 목록 (NaN은 null, NumPy 값은 파이썬 값으로, 날짜는 'YYYY-MM-DD')
+    if "date" in df: df = df.assign(date=df["date"].astype(str))
+    return json.loads(df.to_json(orient="records", force_ascii=False))
+
+def _int(qs, name, default, minimum=None):
+    try: n = int(qs.get(name, [default])[0])
+    except ValueError: raise ValueError(f"{name}는 정수여야 합니다.") from None
+    if minimum is not None and n < minimum: raise ValueError(f"{name}는 {minimum} 이상이어야 합니다.")
+    return n
+
+class HttpError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message); self.status = status
+
+class PetMateAPI:
+    """라우팅과 요청 처리. 서비스 호출(파일/SQLite I/O)은 to_thread로 넘겨 이벤트 루프를 막지 않는다.
+
+    GET  /health
+    GET  /v1/owners/{owner}/pets
+    GET  /v1/owners/{owner}/summary?date=YYYY-MM-DD   내 모든 반려동물의 하루 요약
+    POST /v1/owners/{owner}/intake                   {"entries": [{pet_id, kind, amount, date?, memo?, log_id?}, ...]}
+    GET  /v1/owners/{owner}/report?start=&end=        기간 영양 리포트 (기본: 최근 7일)
+    GET  /v1/owners/{owner}/meds/next?n=10
+    GET  /v1/owners/{owner}/events?pet_id=&view=upcoming|month|future|past&page=0&size=10
+    GET  /v1/unsafe?q=&limit=50
+
+    {owner}는 API 키의 주인과 같아야 한다. 그래서 없는 계정의 파티션은 만들어지지 않는다.
+    """
+
+    def __init__(self, service):
+        self.svc = service
+        self.routes = [
+            ("GET", re.compile(r"/health"), self.health),
+            ("GET", re.compile(r"/v1/owners/([^/]+)/pets"), self.pets),
+            ("GET", re.compile(r"/v1/owners/([^/]+)/summary"), self.summary),
+            ("POST", re.compile(r"/v1/owners/([^/]+)/intake"), self.intake),
+            ("GET", re.compile(r"/v1/owners/([^/]+)/report"), self.report),
+            ("GET", re.compile(r"/v1/owners/([^/]+)/meds/next"), self.next_doses),
+            ("GET", re.compile(r"/v1/owners/([^/]+)/events"), self.events),
+            ("GET", re.compile(r"/v1/unsafe"), self.unsafe),
+        ]
+
+    # ----- 핸들러: (쿼리, 본문, *경로 인자) -> JSON으로 보낼 값 -----
+    async def health(self, qs, body):
+        return {"ok": True}
+
+    async def pets(self, qs, body, owner):
+        return await asyncio.to_thread(self.svc.pets, owner)
+
+    async def summary(self, qs, body, owner):
+        return await asyncio.to_thread(self.svc.dashboard_summary, owner, qs.get("date", [None])[0])
+
+    async def intake(self, qs, body, owner):
+        entries = body.get("entries") if isinstance(body, dict) else body
+        if not isinstance(entries, list): raise ValueError('본문은 {"entries": [...]} 형식이어야 합니다.')
+        return await asyncio.to_thread(self.svc.log_intake, owner, entries)
+
+    async def report(self, qs, body, owner):
+        start, end = qs.get("start", [None])[0], qs.get("end", [None])[0]
+        rep = await asyncio.to_thread(self.svc.health_report, owner, start, end)
+        return {"summary": _rows(rep["summary"].reset_index()), "anomalies": _rows(rep["anomalies"])}
+
+    async def next_doses(self, qs, body, owner):
+        res = await asyncio.to_thread(self.svc.next_doses, owner, _int(qs, "n", 10, minimum=1))
+        return {k: [{"at": dt, "med": s.record} for dt, s in v] for k, v in res.items()}
+
+    async def events(self, qs, body, owner):
+        pet_id = qs.get("pet_id", [""])[0]
+        if not pet_id: raise ValueError("pet_id가 필요합니다.")
+        page, size = _int(qs, "page", 0, minimum=0), min(_int(qs, "size", 10, minimum=1), 100)
+        rows, total = await asyncio.to_thread(self.svc.events, owner, pet_id, qs.get("view", ["upcoming"])[0], page, size)
+        return {"total": total, "page": page, "size": size, "events": [dict(e, dt=dt) for dt, e in rows]}
+
+    async def unsafe(self, qs, body):
+        limit = min(_int(qs, "limit", 50, minimum=1), 500)
+        return await asyncio.to_thread(self.svc.search_unsafe, qs.get("q", [""])[0], limit)
+
+    # ----- HTTP -----
+    async def authenticate(self, headers, owner=None):
+        """API 키의 주인 아이디. 키가 없거나 모르는 키면 401, 다른 사람의 owner 경로면 403."""
+        scheme, _, token = headers.get("authorization", "").partition(" ")
+        user = await asyncio.to_thread(self.svc.auth.api_user, token.strip()) if scheme.lower() == "bearer" else None
+        if user is None: raise HttpError(401, "API 키가 필요합니다.")
+        if owner is not None and owner != user: raise HttpError(403, "다른 사용자의 데이터에는 접근할 수 없습니다.")
+        return user
+
+    async def dispatch(self, method, target, headers, body):
+        url = urlsplit(target)
+        allowed = False
+        for m, pattern, handler in self.routes:
+            hit = pattern.fullmatch(url.path)
+            if not hit: continue
+            if m != method: allowed = True; continue
+            args = [unquote(g) for g in hit.groups()]
+            if url.path not in PUBLIC: await self.authenticate(headers, *args[:1])
+            try: payload = json.loads(body) if body else {}
+            except ValueError: raise HttpError(400, "JSON 형식 오류") from None
+            return await handler(parse_qs(url.query), payload, *args)
+        raise HttpError(405 if allowed else 404, f"{method} {url.path}")
+
+    async def handle(self, reader, writer):
+        try:
+            while True:   # keep-alive: 한 연결에서 요청을 차례로 처리
+                line = await reader.readline()
+                if not line.strip(): break
+                try: method, target, version = line.decode("latin-1").split()
+                except ValueError: break
+                headers = {}
+                while (h := await reader.readline()) not in (b"\r\n", b"\n", b""):
+                    k, _, v = h.decode("latin-1").partition(":")
+                    headers[k.strip().lower()] = v.strip()
+                try: length = int(headers.get("content-length") or 0)
+                except ValueError: length = -1
+                status, keep = 200, headers.get("connection", "").lower() != "close" and version == "HTTP/1.1"
+                if length < 0:   # 본문 경계를 알 수 없으니 이 연결은 여기서 끝낸다
+                    status, result, keep = 400, {"error": "Content-Length 형식 오류"}, False
+                elif length > MAX_BODY:
+                    status, result, keep = 413, {"error": "본문이 너무 큽니다."}, False
+                else:
+                    body = await reader.readexactly(length) if length else b""
+                    try: result = await self.dispatch(method.upper(), target, headers, body)
+                    except HttpError as e: status, result = e.status, {"error": str(e)}
+                    except ValueError as e: status, result = 400, {"error": str(e)}
+                    except Exception as e: status, result = 500, {"error": f"{type(e).__name__}: {e}"}
+                data = json.dumps(result, ensure_ascii=False, default=_jsonable).encode("utf-8")
+                writer.write(f"HTTP/1.1 {status} {REASONS[status]}\r\nContent-Type: application/json; charset=utf-8\r\n"
+                             f"Content-Length: {len(data)}\r\nConnection: {'keep-alive' if keep else 'close'}\r\n\r\n"
+                             .encode("latin-1") + data)
+                await writer.drain()
+                if not keep: break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+async def serve(host="127.0.0.1", port=8600, data_dir="data"):
+    api = PetMateAPI(PetMateService(data_dir))
+    server = await asyncio.start_server(api.handle, host, port)
+    print(f"PetMate API: http://{host}:{port}  (data: {os.path.abspath(data_dir)})")
+    async with server: await server.serve_forever()
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="PetMate HTTP/JSON API")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8600)
+    ap.add_argument("--data-dir", default="data")
+    ap.add_argument("--issue-key", metavar="USER", help="이 계정의 새 API 키를 출력하고 끝낸다 (이전 키는 무효)")
+    args = ap.parse_args(argv)
+    if args.issue_key:
+        try: print(PetMateService(args.data_dir).auth.issue_api_key(args.issue_key))
+        except ValueError as e: ap.error(str(e))
+        return
+    try: asyncio.run(serve(args.host, args.port, args.data_dir))
+    except KeyboardInterrupt: pass
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,213 @@
+# 사용자 인증: 아이디 색인(프로세스 공유) + 추가 전용 계정 파일 + 솔트를 넣은 느린 해시(scrypt)
+import os, json, time, base64, hashlib, hmac, secrets, tempfile, threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from .jsonstore import file_lock, read_json
+
+SCRYPT_N, SCRYPT_R, SCRYPT_P = 2**14, 8, 1   # 해시 한 번에 약 16MB·수십 ms
+PBKDF2_ITERS = 600_000                       # scrypt가 없는 OpenSSL용
+KDF_WORKERS = 2          # 동시에 도는 해시 계산 수 (로그인이 몰려도 CPU를 다 쓰지 않게)
+MAX_FAILURES = 5         # 아이디별 WINDOW초 안의 실패 허용 횟수
+WINDOW = 300
+
+_kdf_pool = ThreadPoolExecutor(max_workers=KDF_WORKERS, thread_name_prefix="petmate-kdf")
+
+def _b64(b): return base64.b64encode(b).decode("ascii")
+
+def hash_password(password, n=SCRYPT_N, r=SCRYPT_R, p=SCRYPT_P):
+    """'scrypt$n$r$p$솔트$해시' (scrypt가 없으면 'pbkdf2_sha256$반복$솔트$해시')"""
+    salt, pw = os.urandom(16), password.encode()
+    if hasattr(hashlib, "scrypt"):
+        dk = hashlib.scrypt(pw, salt=salt, n=n, r=r, p=p, maxmem=256*n*r*p, dklen=32)
+        return f"scrypt${n}${r}${p}${_b64(salt)}${_b64(dk)}"
+    dk = hashlib.pbkdf2_hmac("sha256", pw, salt, PBKDF2_ITERS)
+    return f"pbkdf2_sha256${PBKDF2_ITERS}${_b64(salt)}${_b64(dk)}"
+
+def verify_password(password, stored):
+    """저장된 해시와 비교. 예전 방식(솔트 없는 SHA-256 hex)도 확인만은 해 준다."""
+    pw, parts = password.encode(), str(stored).split("$")
+    try:
+        if parts[0] == "scrypt":
+            n, r, p = map(int, parts[1:4]); salt, dk = map(base64.b64decode, parts[4:6])
+            got = hashlib.scrypt(pw, salt=salt, n=n, r=r, p=p, maxmem=256*n*r*p, dklen=len(dk))
+        elif parts[0] == "pbkdf2_sha256":
+            salt, dk = map(base64.b64decode, parts[2:4])
+            got = hashlib.pbkdf2_hmac("sha256", pw, salt, int(parts[1]), dklen=len(dk))
+        elif len(parts) == 1 and len(stored) == 64:
+            got, dk = hashlib.sha256(pw).hexdigest().encode(), stored.encode()
+        else:
+            return False
+    except (ValueError, TypeError):
+        return False
+    return hmac.compare_digest(got, dk)
+
+def needs_rehash(stored):
+    """예전 SHA-256이거나 지금 설정보다 약한 해시면 True (다음 로그인 때 다시 해시)"""
+    parts = str(stored).split("$")
+    if parts[0] == "scrypt":
+        return tuple(map(int, parts[1:4])) < (SCRYPT_N, SCRYPT_R, SCRYPT_P)
+    if parts[0] == "pbkdf2_sha256":
+        return hasattr(hashlib, "scrypt") or int(parts[1]) < PBKDF2_ITERS
+    return True
+
+def _key_hash(token):
+    # API 키는 256비트 난수라 느린 해시가 필요 없다. 파일과 색인에는 이 값만 둔다.
+    return hashlib.sha256(token.encode()).hexdigest()
+
+# 없는 아이디로 로그인해도 같은 시간이 걸리도록 비교에 쓰는 해시
+_DUMMY = hash_password(os.urandom(16).hex())
+
+class RateLimiter:
+    """키(아이디)별로 최근 window초 안의 실패를 세어 max_failures번을 넘으면 막는다.
+    키마다 최근 max_failures번만 기억하고, 마지막 실패가 window보다 오래된 키는
+    window마다 한 번 정리하므로 없는 아이디를 계속 바꿔 시도해도 메모리가 쌓이지 않는다."""
+
+    def __init__(self, max_failures=MAX_FAILURES, window=WINDOW):
+        self.max_failures, self.window = max_failures, window
+        self._fails, self._lock = {}, threading.Lock()
+        self._swept = None
+
+    def retry_after(self, key, now=None):
+        """막혀 있으면 다시 시도할 수 있을 때까지 남은 초, 아니면 0"""
+        now = now or time.monotonic()
+        with self._lock:
+            q = self._fails.get(key)
+            while q and q[0] <= now - self.window: q.popleft()
+            if not q: self._fails.pop(key, None); return 0
+            return max(0, q[0] + self.window - now) if len(q) >= self.max_failures else 0
+
+    def failed(self, key, now=None):
+        now = now or time.monotonic()
+        with self._lock:
+            if self._swept is None or now - self._swept >= self.window:
+                self._fails = {k: q for k, q in self._fails.items() if q[-1] > now - self.window}
+                self._swept = now
+            self._fails.setdefault(key, deque(maxlen=self.max_failures)).append(now)
+
+    def reset(self, key):
+        with self._lock: self._fails.pop(key, None)
+
+class UserStore:
+    """계정 파일(JSONL, 한 줄에 계정 하나)과 아이디 색인.
+
+    가입과 해시 갱신은 파일 끝에 한 줄을 덧붙이기만 하고, 같은 아이디는 뒤의 줄이
+    앞의 줄을 대신한다. 색인은 파일에서 이미 읽은 위치를 기억해 두었다가 새로 붙은
+    줄만 읽으므로, 조회는 stat 한 번과 dict 조회로 끝난다. API 키 해시(api_key)도 같은
+    방식으로 색인한다. 예전 users.json이 있으면
+    처음 열 때 옮기고 '<파일>.migrated'로 이름을 바꾼다.
+    """
+
+    def __init__(self, path, legacy_path=None):
+        self.path = path
+        self._index, self._inode, self._offset = {}, None, 0
+        self._keys = {}   # API 키 해시 -> 아이디
+        self._lock = threading.Lock()
+        if legacy_path and os.path.exists(legacy_path): self._migrate(legacy_path)
+
+    def _migrate(self, legacy):
+        with file_lock(self.path):
+            if not os.path.exists(legacy): return   # 다른 프로세스가 먼저 옮김
+            self._append_locked(u for u in read_json(legacy, [], locked=True) if u.get("username"))
+            os.replace(legacy, legacy + ".migrated")
+
+    def _refresh(self):
+        # self._lock 안에서 부른다. 파일이 교체(clear)됐으면 처음부터, 아니면 늘어난 부분만 읽는다.
+        try: st = os.stat(self.path)
+        except FileNotFoundError:
+            self._index, self._keys, self._inode, self._offset = {}, {}, None, 0; return
+        if st.st_ino != self._inode or st.st_size < self._offset:
+            self._index, self._keys, self._inode, self._offset = {}, {}, st.st_ino, 0
+        if st.st_size == self._offset: return
+        with open(self.path, "rb") as f:
+            f.seek(self._offset); data = f.read(st.st_size - self._offset)
+        end = data.rfind(b"\n") + 1   # 아직 쓰는 중인 마지막 줄은 다음에
+        for line in data[:end].splitlines():
+            try: rec = json.loads(line)
+            except ValueError: continue
+            if not isinstance(rec, dict) or not rec.get("username"): continue
+            old = self._index.get(rec["username"])
+            if old: self._keys.pop(old.get("api_key"), None)   # 새 키를 받으면 이전 키는 무효
+            self._index[rec["username"]] = rec
+            if rec.get("api_key"): self._keys[rec["api_key"]] = rec["username"]
+        self._offset += end
+
+    def get(self, username):
+        with self._lock:
+            self._refresh()
+            rec = self._index.get(username)
+        return dict(rec) if rec else None
+
+    def by_api_key(self, key_hash):
+        """API 키 해시의 주인 아이디 (없으면 None)"""
+        with self._lock:
+            self._refresh(); return self._keys.get(key_hash)
+
+    def usernames(self):
+        with self._lock:
+            self._refresh(); return list(self._index)
+
+    def __len__(self):
+        with self._lock:
+            self._refresh(); return len(self._index)
+
+    def _append_locked(self, records):
+        data = "".join(json.dumps(r, ensure_ascii=False) + "\n" for r in records).encode("utf-8")
+        if not data: return
+        with open(self.path, "ab") as f:
+            f.write(data); f.flush(); os.fsync(f.fileno())
+
+    def add(self, record, replace=False):
+        """계정 한 줄 추가. replace가 아니면 이미 있는 아이디는 ValueError."""
+        with file_lock(self.path):
+            if not replace:
+                with self._lock: self._refresh(); exists = record["username"] in self._index
+                if exists: raise ValueError("이미 존재하는 아이디입니다.")
+            self._append_locked([record])
+
+    def clear(self):
+        """모든 계정 삭제 (빈 파일로 교체)"""
+        d = os.path.dirname(self.path) or "."
+        with file_lock(self.path):
+            fd, tmp = tempfile.mkstemp(dir=d, prefix=".tmp-")
+            os.close(fd); os.replace(tmp, self.path)
+
+class Authenticator:
+    """로그인/가입. 해시 계산은 KDF_WORKERS개짜리 전용 스레드 풀에서 돌고(hashlib은 계산 중
+    GIL을 놓는다), 호출한 세션만 결과를 기다린다. 실패가 잦은 아이디는 잠시 막는다."""
+
+    def __init__(self, store, limiter=None):
+        self.store, self.limiter = store, limiter or RateLimiter()
+
+    def login(self, username, password):
+        """성공하면 True. 막혀 있으면 ValueError(화면에 보여 줄 안내).
+        예전 SHA-256이나 약한 해시는 맞는 비밀번호로 로그인한 김에 새 해시로 바꿔 둔다."""
+        wait = self.limiter.retry_after(username)
+        if wait: raise ValueError(f"로그인 시도가 너무 많습니다. {int(wait) + 1}초 후 다시 시도해 주세요.")
+        rec = self.store.get(username)
+        stored = rec["password"] if rec else _DUMMY
+        ok = _kdf_pool.submit(verify_password, password, stored).result() and rec is not None
+        if not ok:
+            self.limiter.failed(username); return False
+        self.limiter.reset(username)
+        if needs_rehash(stored):
+            self.store.add(dict(rec, password=_kdf_pool.submit(hash_password, password).result()), replace=True)
+        return True
+
+    def signup(self, username, password):
+        if not username or not password: raise ValueError("아이디와 비밀번호를 모두 입력해주세요.")
+        if self.store.get(username): raise ValueError("이미 존재하는 아이디입니다.")
+        hashed = _kdf_pool.submit(hash_password, password).result()
+        self.store.add({"username": username, "password": hashed})   # 그 사이 같은 아이디가 생겼으면 ValueError
+
+    def issue_api_key(self, username):
+        """username의 새 API 키를 만들어 반환 (이전 키는 더 이상 쓸 수 없다). 키는 이때 한 번만 보여 주고
+        파일에는 해시만 남긴다."""
+        rec = self.store.get(username)
+        if not rec: raise ValueError("존재하지 않는 아이디입니다.")
+        token = "pm_" + secrets.token_urlsafe(32)
+        self.store.add(dict(rec, api_key=_key_hash(token)), replace=True)
+        return token
+
+    def api_user(self, token):
+        """API 키의 주인 아이디, 모르는 키면 None"""
+        return self.store.by_api_key(_key_hash(token)) if token else None
@@ -0,0 +1,112 @@
+# 대량 가져오기/내보내기: 파일 전체를 메모리에 올리지 않고 청크 단위로 처리
+import io, csv, json, uuid, zipfile
+from datetime import date, datetime
+from .logstore import LOG_COLS
+
+CHUNK_SIZE = 5000
+MAX_ERRORS = 20   # 보고서에 남길 오류 예시 개수
+_LOG_NS = uuid.UUID("6f0b8f4e-3c1a-4d52-9a57-2b1f0c6e8d10")
+
+def _text(fileobj):
+    # Streamlit 업로드 파일 등 바이너리 스트림은 텍스트로 감싼다 (BOM 허용)
+    if isinstance(fileobj, io.TextIOBase): return fileobj
+    return io.TextIOWrapper(fileobj, encoding="utf-8-sig", newline="")
+
+def _records(fileobj, fmt, nbytes=None):
+    """(줄 번호, dict 또는 None) 를 하나씩. JSONL의 깨진 줄은 None.
+    nbytes([0])를 주면 읽은 바이트 수를 nbytes[0]에 더해 간다."""
+    f = _text(fileobj)
+    def lines():
+        for line in f:
+            if nbytes is not None: nbytes[0] += len(line.encode("utf-8"))
+            yield line
+    try:
+        if fmt == "csv":
+            reader = csv.DictReader(lines())
+            for row in reader: yield reader.line_num, row
+        elif fmt == "jsonl":
+            for n, line in enumerate(lines(), 1):
+                if not line.strip(): continue
+                try: row = json.loads(line)
+                except ValueError: row = None
+                yield n, row if isinstance(row, dict) else None
+        else:
+            raise ValueError(f"지원하지 않는 형식: {fmt}")
+    finally:
+        # 감싼 텍스트 래퍼가 사라질 때 호출자의 파일까지 닫지 않도록 떼어 낸다
+        if f is not fileobj: f.detach()
+
+def clean_log_row(kind, row, pet_ids=None, seen=None):
+    """feed_cols/water_cols 형식으로 정리한 dict를 반환, 잘못된 행이면 ValueError.
+    log_id가 없으면 내용으로 결정되는 id를 붙여 같은 파일을 다시 가져와도 중복되지 않게 한다.
+    날짜에 시각이 붙어 있으면(2025-01-01T08:00) 저장은 날짜만 하고 id 계산에는 시각까지 쓴다.
+    seen({내용: 횟수})을 주면 같은 파일 안에서 내용이 같은 행을 몇 번째로 만났는지도 id에 넣는다."""
+    cols = LOG_COLS[kind]
+    amount_col = cols[3]
+    pet_id = str(row.get("pet_id") or "").strip()
+    if not pet_id: raise ValueError("pet_id가 없습니다")
+    if pet_ids is not None and pet_id not in pet_ids: raise ValueError(f"등록되지 않은 반려동물: {pet_id}")
+    raw_date = str(row.get("date") or "").strip()
+    try: day = (datetime.fromisoformat(raw_date).date() if len(raw_date) > 10 else date.fromisoformat(raw_date)).isoformat()
+    except ValueError: raise ValueError(f"날짜 형식 오류: {raw_date!r}") from None
+    raw_amount = row.get(amount_col, row.get("amount"))
+    try: amount = int(float(raw_amount))
+    except (TypeError, ValueError): raise ValueError(f"{amount_col} 값 오류: {raw_amount!r}") from None
+    if amount < 0: raise ValueError(f"{amount_col}는 0 이상이어야 합니다")
+    memo = str(row.get("memo") or "").strip()
+    log_id = str(row.get("log_id") or "").strip()
+    if not log_id:
+        # 원래 시각(raw_date)까지 넣어 하루 두 번 같은 양을 준 기기 기록은 구분한다.
+        # 시각 없이 완전히 같은 행이 여러 번 있으면 실제로 여러 번 준 것이므로 순번으로 구분
+        key = f"{kind}|{pet_id}|{raw_date}|{amount}|{memo}"
+        n = 0
+        if seen is not None: n = seen[key] = seen.get(key, -1) + 1
+        log_id = str(uuid.uuid5(_LOG_NS, key if n == 0 else f"{key}|{n}"))
+    return {"log_id": log_id, "pet_id": pet_id, "date": day, amount_col: amount, "memo": memo}
+
+def import_logs(store, kind, fileobj, fmt="csv", pet_ids=None, chunk_size=CHUNK_SIZE, progress=None):
+    """CSV/JSONL 로그를 스트리밍으로 검증해 chunk_size 행씩 store에 추가한다.
+    중복(log_id 기준)은 저장소가 무시한다. log_id 없는 같은 내용의 행은 파일 안의 순번으로
+    구분하므로 같은 파일을 다시 가져오면 중복, 한 파일의 반복 기록은 모두 들어간다. progress(처리한 행 수, 읽은 바이트 수)를 청크마다 호출.
+    반환: {"rows", "inserted", "duplicates", "invalid", "errors": [(줄, 사유), ...]}"""
+    pet_ids = set(pet_ids) if pet_ids is not None else None
+    report = {"rows": 0, "inserted": 0, "duplicates": 0, "invalid": 0, "errors": []}
+    chunk, nbytes, seen = [], [0], {}
+    def flush():
+        inserted = store.append(kind, chunk)
+        report["inserted"] += inserted
+        report["duplicates"] += len(chunk) - inserted
+        chunk.clear()
+        if progress: progress(report["rows"], nbytes[0])
+    for line, row in _records(fileobj, fmt, nbytes):
+        report["rows"] += 1
+        try:
+            if row is None: raise ValueError("JSON 형식 오류")
+            chunk.append(clean_log_row(kind, row, pet_ids, seen))
+        except ValueError as e:
+            report["invalid"] += 1
+            if len(report["errors"]) < MAX_ERRORS: report["errors"].append((line, str(e)))
+            continue
+        if len(chunk) >= chunk_size: flush()
+    if chunk: flush()
+    return report
+
+def export_archive(fileobj, log_store, records, pet_ids=None):
+    """로그(CSV)와 JSON 레코드들을 zip(deflate) 하나로 쓴다.
+    records: {이름: 레코드 목록}. 로그는 저장소에서 배치 단위로 읽어 바로 압축 스트림에 쓴다."""
+    manifest = {"created": datetime.now().isoformat(timespec="seconds"), "counts": {}}
+    with zipfile.ZipFile(fileobj, "w", zipfile.ZIP_DEFLATED) as zf:
+        for kind, cols in LOG_COLS.items():
+            n = 0
+            with zf.open(f"{kind}_log.csv", "w") as raw, \
+                 io.TextIOWrapper(raw, encoding="utf-8", newline="") as f:
+                w = csv.DictWriter(f, fieldnames=cols)
+                w.writeheader()
+                for row in log_store.iter_rows(kind, pet_ids):
+                    w.writerow(row); n += 1
+            manifest["counts"][f"{kind}_log"] = n
+        for name, recs in records.items():
+            zf.writestr(f"{name}.json", json.dumps(recs, ensure_ascii=False, indent=2))
+            manifest["counts"][name] = len(recs)
+        zf.writestr("manifest.json", json.dumps(manifest, ensure_ascii=False, indent=2))
+    return manifest
@@ -0,0 +1,52 @@
+# 프로세스 전역 파일 캐시: Streamlit 재실행·여러 세션이 파싱된 데이터 한 벌을 공유
+import os, copy, threading
+from . import instrument
+
+class FileCache:
+    """경로별 파싱 결과를 (inode, mtime_ns, size)와 함께 보관한다.
+
+    파일이 바뀌지 않았으면 stat 한 번으로 끝나고, save 쪽에서 put()으로
+    써 넣은 값은 다시 읽지 않는다. 호출자가 결과를 수정해도 캐시가 오염되지
+    않도록 꺼낼 때 copier로 복사본을 돌려준다.
+    """
+
+    def __init__(self):
+        self._entries = {}   # path -> (stamp, data)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def stamp(path):
+        try: s = os.stat(path)
+        except FileNotFoundError: return None
+        # 원자적 교체(os.replace)는 새 inode를 만들므로 같은 시각·같은 크기의 쓰기도 구분된다
+        return (s.st_ino, s.st_mtime_ns, s.st_size)
+
+    def get(self, path, loader, copier=copy.deepcopy):
+        """캐시된 값이 최신이면 그 복사본을, 아니면 loader(path)로 읽어 저장 후 반환.
+        파일이 없으면 FileNotFoundError, 파싱 오류는 loader의 예외를 그대로 올린다."""
+        stamp = self.stamp(path)
+        if stamp is None:
+            self.invalidate(path); raise FileNotFoundError(path)
+        hit = self._entries.get(path)
+        if hit and hit[0] == stamp:
+            instrument.count("cache:hit"); return copier(hit[1])
+        with instrument.span("io:load"): data = loader(path)
+        instrument.add_io("read", stamp[2])
+        with self._lock: self._entries[path] = (stamp, data)
+        return copier(data)
+
+    def put(self, path, data, copier=copy.deepcopy):
+        """방금 path에 쓴 data를 그대로 캐시에 반영 (write-through)"""
+        stamp = self.stamp(path)
+        if stamp: instrument.add_io("write", stamp[2])
+        with self._lock:
+            if stamp is None: self._entries.pop(path, None)
+            else: self._entries[path] = (stamp, copier(data))
+
+    def invalidate(self, path=None):
+        with self._lock:
+            if path is None: self._entries.clear()
+            else: self._entries.pop(path, None)
+
+# import된 모듈은 재실행되지 않으므로 이 인스턴스가 프로세스 전체에서 공유된다
+file_cache = FileCache()
@@ -0,0 +1,89 @@
+# 병원 일정 인덱스: 반려동물별로 일시 순 정렬해 두고 bisect로 기간 조회·페이지 나누기
+from bisect import bisect_left, insort
+from datetime import datetime, timedelta
+from dateutil import tz
+
+KST = tz.gettz("Asia/Seoul")   # 일정마다 tz.gettz를 부르지 않도록 한 번만 조회
+
+def parse_dt(value, zone=KST):
+    """ISO 문자열/datetime -> zone 기준 aware datetime.
+    시간대가 없는 값(예전 기록)은 입력 화면 기준인 zone의 시각으로 본다."""
+    dt = value if isinstance(value, datetime) else datetime.fromisoformat(value)
+    if dt.tzinfo is None: return dt.replace(tzinfo=zone)
+    return dt.astimezone(zone)
+
+def normalize_dt(value, zone=KST):
+    """저장용 표기: '2025-03-01T10:00:00+09:00'. 쓸 때 한 번 정규화해 두면 읽을 때 변환이 없다."""
+    return parse_dt(value, zone).isoformat()
+
+def month_range(now):
+    start = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    end = (start + timedelta(days=32)).replace(day=1)
+    return start, end
+
+class EventIndex:
+    """hospital_events를 pet_id별 (일시, id) 정렬 리스트로 들고 있는 인덱스.
+
+    일시는 만들 때 한 번만 파싱하고, 기간 조회는 bisect 두 번으로 범위를 찾은 뒤
+    필요한 페이지 만큼만 잘라 내므로 이력이 길어도 한 화면 비용은 일정하다.
+    """
+
+    def __init__(self, events=(), zone=KST):
+        self.zone = zone
+        self._by_pet = {}   # pet_id -> [(dt, id), ...] 정렬
+        self._events = {}   # id -> (dt, event)
+        for e in events: self._insert(e, bulk=True)
+        for keys in self._by_pet.values(): keys.sort()
+
+    def __len__(self):
+        return len(self._events)
+
+    def _insert(self, e, bulk=False):
+        try: dt = parse_dt(e["dt"], self.zone)
+        except (KeyError, TypeError, ValueError): return   # 일시가 깨진 기록은 건너뜀
+        self._events[e["id"]] = (dt, e)
+        keys = self._by_pet.setdefault(e.get("pet_id"), [])
+        if bulk: keys.append((dt, e["id"]))
+        else: insort(keys, (dt, e["id"]))
+
+    def add(self, e):
+        self.remove(e["id"]); self._insert(e)
+
+    def remove(self, event_id):
+        hit = self._events.pop(event_id, None)
+        if hit is None: return
+        keys = self._by_pet.get(hit[1].get("pet_id"), [])
+        i = bisect_left(keys, (hit[0], event_id))
+        if i < len(keys) and keys[i][1] == event_id: del keys[i]
+
+    def _span(self, pet_id, start=None, end=None):
+        # [start, end) 에 해당하는 정렬 리스트 위치 범위
+        keys = self._by_pet.get(pet_id, [])
+        lo = bisect_left(keys, (start, "")) if start else 0
+        hi = bisect_left(keys, (end, "")) if end else len(keys)
+        return keys, lo, hi
+
+    def count(self, pet_id, start=None, end=None):
+        _, lo, hi = self._span(pet_id, start, end)
+        return hi - lo
+
+    def window(self, pet_id, start=None, end=None, page=0, size=10, reverse=False):
+        """[start, end) 일정 중 page번째 페이지의 [(일시, 일정), ...]와 전체 건수.
+        reverse면 최근 것부터 (지난 일정 보기용)."""
+        keys, lo, hi = self._span(pet_id, start, end)
+        if reverse:
+            b = hi - page * size; a = max(lo, b - size)
+            picked = reversed(keys[a:max(a, b)])
+        else:
+            a = lo + page * size
+            picked = keys[a:min(hi, a + size)]
+        return [(dt, self._events[i][1]) for dt, i in picked], hi - lo
+
+    def upcoming(self, pet_id, now, days=7, **kw):
+        return self.window(pet_id, now, now + timedelta(days=days), **kw)
+
+    def this_month(self, pet_id, now, **kw):
+        return self.window(pet_id, *month_range(now), **kw)
+
+    def past(self, pet_id, now, **kw):
+        return self.window(pet_id, None, now, reverse=True, **kw)
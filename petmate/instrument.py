@@ -0,0 +1,74 @@
+# 성능 계측 (선택): 재실행 한 번의 구간별 시간, 디스크 I/O 바이트, 캐시 적중 수를 모은다
+# 기록 중이 아닐 때 span()/add_io()는 스레드 로컬 조회 한 번으로 끝난다.
+import csv, io, json, time, threading
+from collections import defaultdict
+from contextlib import contextmanager
+
+_local = threading.local()   # Streamlit은 세션의 스크립트를 각자의 스레드에서 실행한다
+
+class Recorder:
+    """재실행(또는 API 요청) 한 번의 기록"""
+
+    def __init__(self, label=""):
+        self.label, self.started = label, time.time()
+        self._t0 = time.perf_counter()
+        self.total_ms = None
+        self.spans = defaultdict(float)   # 이름 -> 누적 ms
+        self.counts = defaultdict(int)    # 이름 -> 횟수 (io/cache/sqlite 등)
+
+    def add(self, name, ms):
+        self.spans[name] += ms; self.counts[name] += 1
+
+    def finish(self):
+        self.total_ms = (time.perf_counter() - self._t0) * 1e3
+        return self
+
+    def as_dict(self):
+        return {"label": self.label, "started": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(self.started)),
+                "total_ms": round(self.total_ms or 0, 2),
+                "spans": {k: round(v, 3) for k, v in self.spans.items()}, "counts": dict(self.counts)}
+
+def active():
+    return getattr(_local, "rec", None)
+
+def begin(label=""):
+    """이 스레드에서 기록 시작 (이전 기록이 끝나지 않았으면 버린다: st.rerun/st.stop 등)"""
+    _local.rec = Recorder(label)
+    return _local.rec
+
+def end():
+    """기록을 끝내고 Recorder를 반환 (기록 중이 아니면 None)"""
+    rec, _local.rec = active(), None
+    return rec.finish() if rec else None
+
+@contextmanager
+def span(name):
+    rec = active()
+    if rec is None:
+        yield; return
+    t = time.perf_counter()
+    try: yield
+    finally: rec.add(name, (time.perf_counter() - t) * 1e3)
+
+def add_io(op, nbytes):
+    """JSON 파일(datacache) I/O. op: 'read'/'write'. 바이트 수는 counts['io:<op>_bytes']에, 횟수는 counts['io:<op>']에.
+    SQLite 로그 저장소는 바이트 대신 counts['sqlite:rows'](변경 행 수)로 센다."""
+    rec = active()
+    if rec is None: return
+    rec.counts[f"io:{op}"] += 1; rec.counts[f"io:{op}_bytes"] += nbytes
+
+def count(name, n=1):
+    rec = active()
+    if rec is not None: rec.counts[name] += n
+
+def export(records, fmt="json"):
+    """Recorder.as_dict() 목록을 JSON 또는 CSV(구간/카운터를 열로 펼침) 문자열로"""
+    if fmt == "json": return json.dumps(records, ensure_ascii=False, indent=2)
+    cols = sorted({f"ms:{k}" for r in records for k in r["spans"]} | {k for r in records for k in r["counts"]})
+    buf = io.StringIO()
+    w = csv.writer(buf)
+    w.writerow(["started", "label", "total_ms"] + cols)
+    for r in records:
+        w.writerow([r["started"], r["label"], r["total_ms"]] +
+                   [r["spans"].get(c[3:], "") if c.startswith("ms:") else r["counts"].get(c, "") for c in cols])
+    return buf.getvalue()
@@ -0,0 +1,126 @@
+# JSON 레코드 저장소: 파일 잠금 + 임시파일 교체로 여러 세션이 동시에 써도 안전하게
+import os, json, time, tempfile, threading
+from contextlib import contextmanager
+from .datacache import file_cache
+
+try:
+    import fcntl
+except ImportError:   # Windows
+    fcntl = None
+    import msvcrt
+
+_thread_locks = {}
+_thread_locks_guard = threading.Lock()
+
+@contextmanager
+def file_lock(path):
+    """'<path>.lock'에 대한 배타 잠금. 같은 프로세스의 스레드(세션)끼리도,
+    서로 다른 프로세스끼리도 한 번에 하나만 들어온다."""
+    key = os.path.abspath(path)
+    with _thread_locks_guard: tl = _thread_locks.setdefault(key, threading.Lock())
+    with tl, open(path + ".lock", "a+") as f:
+        if fcntl: fcntl.flock(f, fcntl.LOCK_EX)
+        else: f.seek(0); msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+        try: yield
+        finally:
+            if fcntl: fcntl.flock(f, fcntl.LOCK_UN)
+            else: f.seek(0); msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+def _read(path):
+    with open(path, "r", encoding="utf-8") as f: return json.load(f)
+
+def _quarantine(path):
+    if os.path.exists(path): os.replace(path, f"{path}.corrupt-{int(time.time())}")
+    file_cache.invalidate(path)
+
+def read_json(path, default, locked=False):
+    """캐시를 거쳐 읽는다. 파일이 없으면 default.
+    깨진 파일은 '<path>.corrupt-<시각>'으로 옮겨 두고 default를 돌려주므로
+    다음 저장이 원본을 덮어써도 내용은 남는다. (locked: 호출자가 이미 잠금을 잡음)"""
+    try: return file_cache.get(path, _read)
+    except FileNotFoundError: return default
+    except ValueError:
+        if locked: _quarantine(path)
+        else:
+            with file_lock(path): _quarantine(path)
+        return default
+
+def write_json_atomic(path, data):
+    """같은 디렉터리의 임시 파일에 다 쓴 뒤 os.replace로 바꿔치기.
+    읽는 쪽은 항상 이전 내용 전체 또는 새 내용 전체만 보게 된다."""
+    d = os.path.dirname(path) or "."
+    fd, tmp = tempfile.mkstemp(dir=d, prefix=".tmp-", suffix=".json")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+            f.flush(); os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        try: os.remove(tmp)
+        except OSError: pass
+        raise
+    file_cache.put(path, data)
+
+class JsonStore:
+    """key 필드(기본 'id')로 구분되는 레코드 목록을 담은 JSON 파일.
+
+    변경은 전부 transaction() 안에서 잠금을 잡고 디스크의 최신 내용을 기준으로
+    적용하므로, 세션이 들고 있던 목록이 오래됐더라도 다른 세션의 변경을
+    덮어쓰지 않는다. version()이 바뀌면 다른 곳에서 파일이 갱신된 것이다.
+    """
+
+    def __init__(self, path, key="id", default=None):
+        self.path, self.key = path, key
+        self.default = default if default is not None else []
+        self._local = threading.local()
+
+    def load(self, locked=False):
+        return read_json(self.path, list(self.default), locked)
+
+    def version(self):
+        return file_cache.stamp(self.path)
+
+    def committed_version(self):
+        """이 스레드가 마지막으로 쓴 직후의 버전 (그 뒤 다른 세션이 쓴 것은 포함하지 않음)"""
+        return getattr(self._local, "version", None)
+
+    @contextmanager
+    def transaction(self, on_commit=None, on_write=None):
+        """잠금을 잡은 채 최신 목록을 넘겨주고, 블록이 정상 종료되면 원자적으로 저장.
+        on_commit(이전 버전, 새 버전)은 잠금을 놓기 전에 호출되므로 파생 인덱스를
+        다른 세션의 쓰기와 섞이지 않게 갱신할 수 있다. on_write(이전 목록, 새 목록)도
+        같은 때 불리며, 레코드가 가리키는 외부 자원(사진 참조 수 등)을 옮길 때 쓴다."""
+        with file_lock(self.path):
+            file_cache.invalidate(self.path)   # 잠금 안에서는 반드시 디스크 기준
+            before = self.version()
+            records = self.load(locked=True)
+            prior = list(records)
+            yield records
+            write_json_atomic(self.path, records)
+            self._local.version = after = self.version()
+            if on_write: on_write(prior, records)
+            if on_commit: on_commit(before, after)
+
+    def apply(self, upserts=(), deletes=(), on_commit=None, on_write=None):
+        """여러 레코드 추가/수정과 삭제를 한 번의 쓰기로 반영하고 새 목록을 반환"""
+        upserts = {r[self.key]: r for r in upserts}
+        deletes = set(deletes)
+        with self.transaction(on_commit, on_write) as records:
+            out = []
+            for r in records:
+                k = r.get(self.key)
+                if k in deletes: continue
+                out.append(upserts.pop(k) if k in upserts else r)
+            out.extend(upserts.values())
+            records[:] = out
+        return out
+
+    def upsert(self, record, on_commit=None):
+        return self.apply(upserts=[record], on_commit=on_commit)
+
+    def delete(self, record_id):
+        return self.apply(deletes=[record_id])
+
+    def replace_all(self, records, on_write=None):
+        with self.transaction(on_write=on_write) as cur: cur[:] = records
+        return records
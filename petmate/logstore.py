@@ -0,0 +1,215 @@
+# 사료/급수 로그 저장소: CSV 전체 재작성 대신 SQLite에 행 단위로 추가(append)
+import os, csv, sqlite3, threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from datetime import date
+from . import instrument
+
+LOG_COLS = {
+    "feed": ["log_id","pet_id","date","amount_g","memo"],
+    "water": ["log_id","pet_id","date","amount_ml","memo"],
+}
+BATCH_SIZE = 1000
+
+def _table(kind):
+    if kind not in LOG_COLS: raise ValueError(f"알 수 없는 로그 종류: {kind}")
+    return f"{kind}_log"
+
+class LogStore:
+    """feed/water 로그를 담는 append-only 저장소.
+
+    기록은 INSERT 한 건으로 끝나고, 조회는 (pet_id, date) 인덱스를 타므로
+    전체 이력을 읽지 않는다. 삭제/초기화 후 남는 빈 페이지와 WAL 파일은
+    compact()가 백그라운드에서 정리한다.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._compacting = threading.Lock()
+        d = os.path.dirname(path)
+        if d: os.makedirs(d, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+            for kind, cols in LOG_COLS.items():
+                t = _table(kind)
+                conn.execute(f"""CREATE TABLE IF NOT EXISTS {t} (
+                    log_id TEXT PRIMARY KEY, pet_id TEXT NOT NULL, date TEXT NOT NULL,
+                    {cols[3]} INTEGER NOT NULL, memo TEXT DEFAULT '')""")
+                conn.execute(f"CREATE INDEX IF NOT EXISTS {t}_pet_date ON {t}(pet_id, date)")
+            self._init_totals(conn)
+
+    def _init_totals(self, conn):
+        # (kind, pet_id, date)별 합계. 로그 테이블의 트리거가 같은 트랜잭션 안에서 갱신한다.
+        # seq는 바뀔 때마다 커지는 변경 번호로, 분석 캐시가 바뀐 칸만 다시 읽는 데 쓴다.
+        # 그래서 로그가 모두 지워진 날도 행을 지우지 않고 n=0으로 남긴다.
+        fresh = not conn.execute("SELECT 1 FROM sqlite_master WHERE name='daily_totals'").fetchone()
+        conn.execute("""CREATE TABLE IF NOT EXISTS daily_totals (
+            kind TEXT NOT NULL, pet_id TEXT NOT NULL, date TEXT NOT NULL,
+            total INTEGER NOT NULL DEFAULT 0, n INTEGER NOT NULL DEFAULT 0, seq INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (kind, pet_id, date)) WITHOUT ROWID""")
+        if "seq" not in [r[1] for r in conn.execute("PRAGMA table_info(daily_totals)")]:
+            conn.execute("ALTER TABLE daily_totals ADD COLUMN seq INTEGER NOT NULL DEFAULT 0")
+            for t in map(_table, LOG_COLS):   # seq 없는 예전 트리거는 새로 만든다
+                conn.execute(f"DROP TRIGGER IF EXISTS {t}_ins"); conn.execute(f"DROP TRIGGER IF EXISTS {t}_del")
+        conn.execute("CREATE INDEX IF NOT EXISTS daily_totals_seq ON daily_totals(seq)")
+        conn.execute("CREATE INDEX IF NOT EXISTS daily_totals_date ON daily_totals(date)")
+        next_seq = "(SELECT IFNULL(MAX(seq), 0) + 1 FROM daily_totals)"
+        for kind, cols in LOG_COLS.items():
+            t, amt = _table(kind), cols[3]
+            conn.execute(f"""CREATE TRIGGER IF NOT EXISTS {t}_ins AFTER INSERT ON {t} BEGIN
+                INSERT INTO daily_totals (kind, pet_id, date, total, n, seq)
+                VALUES ('{kind}', NEW.pet_id, NEW.date, NEW.{amt}, 1, {next_seq})
+                ON CONFLICT (kind, pet_id, date) DO UPDATE SET total=total+excluded.total, n=n+1, seq=excluded.seq;
+            END""")
+            conn.execute(f"""CREATE TRIGGER IF NOT EXISTS {t}_del AFTER DELETE ON {t} BEGIN
+                UPDATE daily_totals SET total=total-OLD.{amt}, n=n-1, seq={next_seq}
+                WHERE kind='{kind}' AND pet_id=OLD.pet_id AND date=OLD.date;
+            END""")
+            if fresh:   # 집계 테이블이 없던 기존 DB는 한 번만 채워 넣는다
+                conn.execute(f"""INSERT INTO daily_totals (kind, pet_id, date, total, n)
+                    SELECT '{kind}', pet_id, date, SUM({amt}), COUNT(*) FROM {t} GROUP BY pet_id, date""")
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            with instrument.span("sqlite"), conn: yield conn   # 정상 종료 시 commit, 예외 시 rollback
+            # SQLite 쓰기는 바이트를 알 수 없으니 커밋된 변경 행 수(트리거가 바꾼 집계 행 포함)로 센다
+            if conn.total_changes: instrument.count("sqlite:rows", conn.total_changes)
+        finally:
+            conn.close()
+
+    def append(self, kind, rows):
+        """rows(dict 목록)를 한 트랜잭션으로 추가하고 실제 추가된 행 수를 돌려준다.
+        이미 있는 log_id는 무시하므로 같은 데이터를 두 번 넣어도 안전하다."""
+        cols = LOG_COLS[kind]
+        sql = f"INSERT OR IGNORE INTO {_table(kind)} ({','.join(cols)}) VALUES ({','.join('?'*len(cols))})"
+        with self._connect() as conn:
+            # rowcount는 트리거가 바꾼 daily_totals 행은 세지 않는다
+            return conn.executemany(sql, ([r.get(c, "") for c in cols] for r in rows)).rowcount
+
+    def query(self, kind, pet_id=None, start=None, end=None):
+        """조건에 맞는 로그만 dict 목록으로 반환 (start/end는 'YYYY-MM-DD', 양 끝 포함)"""
+        cols = LOG_COLS[kind]
+        where, args = [], []
+        if pet_id is not None: where.append("pet_id=?"); args.append(pet_id)
+        if start: where.append("date>=?"); args.append(start)
+        if end: where.append("date<=?"); args.append(end)
+        sql = f"SELECT {','.join(cols)} FROM {_table(kind)}"
+        if where: sql += " WHERE " + " AND ".join(where)
+        with self._connect() as conn:
+            return [dict(zip(cols, r)) for r in conn.execute(sql + " ORDER BY rowid", args)]
+
+    def iter_rows(self, kind, pet_ids=None, batch=BATCH_SIZE):
+        """로그를 batch 행씩 끊어 읽는 제너레이터 (내보내기용, 전체를 메모리에 올리지 않음)"""
+        cols = LOG_COLS[kind]
+        sql, args = f"SELECT {','.join(cols)} FROM {_table(kind)}", []
+        if pet_ids is not None:
+            pet_ids = list(pet_ids)
+            if not pet_ids: return
+            sql += f" WHERE pet_id IN ({','.join('?'*len(pet_ids))})"; args = pet_ids
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            cur = conn.execute(sql + " ORDER BY rowid", args)
+            while True:
+                rows = cur.fetchmany(batch)
+                if not rows: break
+                for r in rows: yield dict(zip(cols, r))
+        finally:
+            conn.close()
+
+    def daily_total(self, kind, pet_id, day):
+        """하루 합계 (기본키 조회 한 번)"""
+        with self._connect() as conn:
+            r = conn.execute("SELECT total FROM daily_totals WHERE kind=? AND pet_id=? AND date=?",
+                             (kind, pet_id, day)).fetchone()
+        return r[0] if r else 0
+
+    def daily_totals(self, kind, pet_id, start=None, end=None):
+        """{'YYYY-MM-DD': 합계} (날짜순). 원본 로그가 아닌 일별 집계만 읽는다."""
+        sql, args = "SELECT date, total FROM daily_totals WHERE kind=? AND pet_id=? AND n>0", [kind, pet_id]
+        if start: sql += " AND date>=?"; args.append(start)
+        if end: sql += " AND date<=?"; args.append(end)
+        with self._connect() as conn:
+            return OrderedDict(conn.execute(sql + " ORDER BY date", args).fetchall())
+
+    def rollup(self, kind, pet_id, period="week", start=None, end=None):
+        """주('2025-W03', ISO 주차) 또는 월('2025-01') 단위 합계 {기간: 합계}"""
+        if period not in ("week", "month"): raise ValueError(f"지원하지 않는 기간: {period}")
+        out = OrderedDict()
+        for d, total in self.daily_totals(kind, pet_id, start, end).items():
+            if period == "month": key = d[:7]
+            else:
+                y, w, _ = date.fromisoformat(d).isocalendar(); key = f"{y}-W{w:02d}"
+            out[key] = out.get(key, 0) + total
+        return out
+
+    def totals_seq(self):
+        """집계 테이블의 마지막 변경 번호 (로그가 추가/삭제될 때마다 커진다)"""
+        with self._connect() as conn:
+            return conn.execute("SELECT IFNULL(MAX(seq), 0) FROM daily_totals").fetchone()[0]
+
+    def totals_between(self, start, end, since=None):
+        """기간 안 모든 반려동물의 일별 합계 [(kind, pet_id, date, total, n), ...].
+        since를 주면 그 변경 번호 이후에 바뀐 칸만 (n=0이면 그날 로그가 모두 지워진 것)."""
+        sql, args = "SELECT kind, pet_id, date, total, n FROM daily_totals WHERE date>=? AND date<=?", [start, end]
+        if since is None: sql += " AND n>0"
+        else: sql += " AND seq>?"; args.append(since)
+        with self._connect() as conn:
+            return conn.execute(sql, args).fetchall()
+
+    def copy_pets(self, ids):
+        """ids({예전 pet_id: 새 pet_id})대로 로그를 복사한다. 복사본의 log_id는 '<원래 log_id>@<새 pet_id>'라
+        다시 실행해도 중복되지 않는다. 집계는 추가 트리거가 맞춰 준다."""
+        with self._connect() as conn:
+            for kind, cols in LOG_COLS.items():
+                t, amt = _table(kind), cols[3]
+                conn.executemany(f"""INSERT OR IGNORE INTO {t} (log_id, pet_id, date, {amt}, memo)
+                    SELECT log_id || '@' || ?1, ?1, date, {amt}, memo FROM {t} WHERE pet_id=?2""",
+                                 ((new, old) for old, new in ids.items()))
+
+    def count(self, kind):
+        with self._connect() as conn:
+            return conn.execute(f"SELECT COUNT(*) FROM {_table(kind)}").fetchone()[0]
+
+    def clear(self, kind, pet_ids=None):
+        """로그 삭제. pet_ids를 주면 그 반려동물들의 로그만 지운다."""
+        with self._connect() as conn:
+            # 집계는 삭제 트리거가 맞춰 준다 (트리거가 있으면 전체 DELETE도 행마다 실행됨)
+            if pet_ids is None:
+                conn.execute(f"DELETE FROM {_table(kind)}")
+            else:
+                conn.executemany(f"DELETE FROM {_table(kind)} WHERE pet_id=?", ((p,) for p in pet_ids))
+        self.compact_async()
+
+    def compact(self):
+        """WAL을 본 파일에 반영해 비우고, 삭제로 생긴 빈 페이지를 반환한다."""
+        if not self._compacting.acquire(blocking=False): return   # 이미 진행 중
+        try:
+            conn = sqlite3.connect(self.path, timeout=30)
+            try:
+                conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+                conn.execute("PRAGMA incremental_vacuum")
+            finally:
+                conn.close()
+        finally:
+            self._compacting.release()
+
+    def compact_async(self):
+        threading.Thread(target=self.compact, daemon=True).start()
+
+    def migrate_csv(self, kind, csv_path):
+        """기존 CSV 로그를 BATCH_SIZE 단위로 읽어 옮긴 뒤 '<파일>.migrated'로 이름을 바꾼다.
+        log_id 기준으로 중복을 무시하므로 중간에 끊겨도 다시 실행하면 된다."""
+        if not os.path.exists(csv_path): return 0
+        moved, batch = 0, []
+        with open(csv_path, newline="", encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                if not row.get("log_id") or not row.get("pet_id"): continue
+                batch.append(row)
+                if len(batch) >= BATCH_SIZE:
+                    moved += self.append(kind, batch); batch = []
+        if batch: moved += self.append(kind, batch)
+        os.replace(csv_path, csv_path + ".migrated")
+        return moved
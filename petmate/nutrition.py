@@ -0,0 +1,11 @@
+# 사료/급수 권장량 계산
+
+def recommended_food_grams(species:str,weight_kg:float)->tuple:
+    if weight_kg<=0: return (0,0)
+    if species.lower() in ["개","강아지","dog"]:
+        kcal=weight_kg*30+70; grams=round(kcal/3.5)
+    else:
+        kcal=60*weight_kg; grams=round(kcal/3.5)
+    return grams,max(0,round(grams*0.1))
+def recommended_water_ml(weight_kg:float)->int:
+    return int(round(weight_kg*60)) if weight_kg>0 else 0
@@ -0,0 +1,72 @@
+# 사용자(owner)별 데이터 파티션: data/owners/<owner>/{pets,med_schedule,hospital_events}.json
+import os, uuid
+from urllib.parse import quote
+from .jsonstore import JsonStore, file_lock, read_json, write_json_atomic
+
+OWNED = ("pets", "med_schedule", "hospital_events")
+LEGACY_STATE = "legacy_owners.json"   # 공용 파일을 나눠 받을 계정과 이미 받은 계정
+_LEGACY_NS = uuid.UUID("3d6f3c52-8b1e-4f0a-9c7d-5e2a1b4c6d80")
+
+def owner_dir(data_dir, owner):
+    # 아이디에 '/'나 '..'가 있어도 디렉터리를 벗어나지 않도록 인코딩
+    return os.path.join(data_dir, "owners", quote(owner, safe="").replace(".", "%2E") or "_")
+
+def owner_stores(data_dir, owner):
+    """owner 한 명의 저장소 묶음. 세션 메모리·로딩 시간은 이 사람 데이터 크기에만 비례한다."""
+    d = owner_dir(data_dir, owner)
+    os.makedirs(d, exist_ok=True)
+    return {name: JsonStore(os.path.join(d, f"{name}.json")) for name in OWNED}
+
+def plan_legacy(data_dir, legacy_paths, accounts):
+    """공용 파일이 남아 있으면 지금 있는 계정 목록을 옮길 대상으로 한 번만 기록해 둔다.
+    업그레이드 뒤에 가입한 계정은 예전 공용 데이터를 받지 않는다."""
+    if not any(os.path.exists(legacy_paths[n]) for n in OWNED): return
+    state = os.path.join(data_dir, LEGACY_STATE)
+    with file_lock(state):
+        if not os.path.exists(state):
+            write_json_atomic(state, {"owners": sorted(set(accounts)), "done": []})
+
+def migrate_legacy(data_dir, owner, legacy_paths, adopt=None):
+    """파티션 도입 전 공용 파일({name: path})의 레코드를 owner 파티션으로 복사한다.
+
+    예전에는 모든 사용자가 모든 반려동물을 봤으므로, plan_legacy()에 기록된 계정마다
+    같은 레코드를 한 벌씩 받는다 ('owner' 필드가 있는 pet은 그 계정만). 여러 계정이 받는
+    pet은 계정마다 새 id(owner와 예전 id로 정해지는 uuid5)를 붙이고, 복약/병원 일정의
+    pet_id도 따라 바꾼다. adopt(name, records, ids)를 주면 저장 전에 복사본을 고치거나
+    예전 id -> 새 id(ids)에 딸린 데이터(섭취 로그 등)를 복사할 수 있다.
+
+    기록된 계정이 모두 받아 가면 공용 파일을 '<path>.migrated'로 바꾸고, 계정마다 새 id를
+    받은 예전 pet id 목록을 반환한다 (그 밖에는 None). 이후 로그인에서는 stat 한 번으로 끝난다.
+    """
+    if not any(os.path.exists(legacy_paths[n]) for n in OWNED): return None
+    state_path = os.path.join(data_dir, LEGACY_STATE)
+    with file_lock(state_path):
+        state = read_json(state_path, {"owners": [], "done": []}, locked=True)
+        if not state["owners"]: state["owners"] = [owner]   # 계정이 없던 설치: 처음 로그인한 사람이 받는다
+        if owner not in state["owners"] or owner in state["done"]: return None
+        shared = len(state["owners"]) > 1
+        pet_owner, ids = {}, {}
+        for name in OWNED:
+            path = legacy_paths[name]
+            if not os.path.exists(path): continue
+            mine = []
+            for r in read_json(path, [], locked=True):
+                if name == "pets":
+                    who = pet_owner[r.get("id")] = r.get("owner")
+                    if shared and who not in state["owners"]:   # 여러 계정이 나눠 받는 pet
+                        ids[r.get("id")] = str(uuid.uuid5(_LEGACY_NS, f"{owner}|{r.get('id')}"))
+                    key = "id"
+                else:
+                    who, key = pet_owner.get(r.get("pet_id")), "pet_id"
+                if who == owner or who not in state["owners"]:
+                    r = dict(r)
+                    if r.get(key) in ids: r[key] = ids[r[key]]
+                    mine.append(r)
+            if adopt: mine = adopt(name, mine, ids)
+            owner_stores(data_dir, owner)[name].apply(upserts=mine)
+        state["done"].append(owner)
+        write_json_atomic(state_path, state)
+        if set(state["owners"]) - set(state["done"]): return None
+        for name in OWNED:
+            if os.path.exists(legacy_paths[name]): os.replace(legacy_paths[name], legacy_paths[name] + ".migrated")
+        return list(ids)
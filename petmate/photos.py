@@ -0,0 +1,113 @@
+# 반려동물 사진 저장소: 내용 해시로 저장(같은 사진은 한 벌), 업로드 때 썸네일 생성, 참조 수로 정리
+import os, io, time, hashlib, tempfile
+from functools import lru_cache
+from PIL import Image, ImageOps
+from .jsonstore import file_lock, read_json, write_json_atomic
+
+THUMB_PX = 150
+EXTS = {".jpg", ".jpeg", ".png"}
+SWEEP_AFTER = 24 * 3600   # 참조 없는 업로드를 지우기까지 기다리는 시간(초): 아직 저장하지 않은 편집을 위해
+
+def _write_atomic(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".tmp-")
+    with os.fdopen(fd, "wb") as f: f.write(data)
+    os.replace(tmp, path)
+
+@lru_cache(maxsize=256)
+def _read_bytes(path):
+    # 파일 이름이 곧 내용 해시라서 무효화가 필요 없다. 썸네일만 담으므로 크기도 작다.
+    with open(path, "rb") as f: return f.read()
+
+class PhotoStore:
+    """원본은 originals/<해시 앞 2자리>/<해시><확장자>, 썸네일은 thumbs/…/<해시>.(jpg|png).
+
+    사진 키(key)는 '<sha256><확장자>'이고, 레코드가 몇 개나 가리키는지 refs.json에
+    세어 두었다가 0이 되면 원본과 썸네일을 지운다. put()은 파일만 만들고 참조 수는
+    바꾸지 않으므로, 레코드를 실제로 저장할 때 retain()/release()를 부른다. 끝내 저장되지
+    않은 업로드(취소한 편집, 실패한 폼 제출)는 sweep()이 시간이 지난 뒤 지운다.
+    """
+
+    def __init__(self, root):
+        self.root = root
+        self.refs_path = os.path.join(root, "refs.json")
+        os.makedirs(root, exist_ok=True)
+
+    def _path(self, kind, key, ext=None):
+        h, e = os.path.splitext(key)
+        return os.path.join(self.root, kind, h[:2], h + (ext if ext is not None else e))
+
+    def original_path(self, key):
+        return self._path("originals", key)
+
+    def thumbnail_path(self, key):
+        for ext in (".jpg", ".png"):
+            p = self._path("thumbs", key, ext)
+            if os.path.exists(p): return p
+        return None
+
+    def put(self, data, filename=""):
+        """업로드 바이트를 저장하고 키를 반환. 같은 내용이면 아무것도 새로 쓰지 않는다."""
+        ext = os.path.splitext(filename)[1].lower()
+        key = hashlib.sha256(data).hexdigest() + (ext if ext in EXTS else ".jpg")
+        orig = self.original_path(key)
+        if not os.path.exists(orig): _write_atomic(orig, data)
+        else: os.utime(orig)   # 다시 올린 사진은 새 업로드로 보고 sweep()의 유예 시간을 새로 시작
+        thumb = self.thumbnail_path(key)
+        if not thumb: self._make_thumbnail(key, data)
+        else: os.utime(thumb)
+        return key
+
+    def _make_thumbnail(self, key, data):
+        try:
+            im = ImageOps.exif_transpose(Image.open(io.BytesIO(data)))
+        except Exception:
+            return   # 이미지가 아니면 썸네일 없이 원본만 (표시 쪽에서 원본으로 대체)
+        im.thumbnail((THUMB_PX, THUMB_PX * 4))   # 가로 150px 기준, 세로로 긴 사진도 허용
+        buf = io.BytesIO()
+        if im.mode in ("RGBA", "LA", "P"):
+            im.save(buf, "PNG", optimize=True); ext = ".png"
+        else:
+            im.convert("RGB").save(buf, "JPEG", quality=85, optimize=True); ext = ".jpg"
+        _write_atomic(self._path("thumbs", key, ext), buf.getvalue())
+
+    def thumbnail(self, key):
+        """표시용 바이트 (썸네일, 없으면 원본). 최근 256개는 메모리에서 바로 돌려준다."""
+        p = self.thumbnail_path(key) or self.original_path(key)
+        return _read_bytes(p) if os.path.exists(p) else None
+
+    def _update_refs(self, key, delta):
+        with file_lock(self.refs_path):
+            refs = read_json(self.refs_path, {}, locked=True)
+            n = refs.get(key, 0) + delta
+            if n > 0: refs[key] = n
+            else: refs.pop(key, None)
+            write_json_atomic(self.refs_path, refs)
+            if n <= 0: self._delete(key)
+
+    def retain(self, key):
+        if key: self._update_refs(key, +1)
+
+    def release(self, key):
+        if key: self._update_refs(key, -1)
+
+    def _delete(self, key):
+        for p in (self.original_path(key), self.thumbnail_path(key)):
+            if p and os.path.exists(p): os.remove(p)
+
+    def sweep(self, older_than=SWEEP_AFTER):
+        """refs.json에 없는 파일 중 older_than초보다 오래된 것을 지우고 지운 개수를 반환.
+        put()만 하고 아직 retain()하지 않은 최근 업로드는 남겨 둔다."""
+        cutoff = time.time() - older_than
+        removed = 0
+        with file_lock(self.refs_path):
+            live = {os.path.splitext(k)[0] for k in read_json(self.refs_path, {}, locked=True)}
+            for kind in ("originals", "thumbs"):
+                for d, _, files in os.walk(os.path.join(self.root, kind)):
+                    for f in files:
+                        p = os.path.join(d, f)
+                        if os.path.splitext(f)[0] in live: continue
+                        try:
+                            if os.stat(p).st_mtime < cutoff: os.remove(p); removed += 1
+                        except FileNotFoundError: pass
+        return removed
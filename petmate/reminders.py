@@ -0,0 +1,171 @@
+# 복약 알림 엔진: 스케줄을 한 번만 해석하고, 다음 복용 시각들을 힙으로 관리
+import heapq, itertools
+from bisect import bisect_left, bisect_right
+from collections import deque, namedtuple
+from datetime import date, datetime, time, timedelta, timezone
+
+Schedule = namedtuple("Schedule", "id pet_id drug dose unit times start end record")
+
+def parse_schedule(rec, default_start=None):
+    """med_schedule 레코드 -> Schedule. 시간은 정렬·중복 제거하고 형식이 틀린 값은 버린다.
+    유효한 복용 시간이 하나도 없으면 None."""
+    times = set()
+    for t in rec.get("times", []):
+        try: times.add(time.fromisoformat(str(t).strip()))
+        except ValueError: pass
+    if not times: return None
+    def _d(v):
+        try: return date.fromisoformat(v) if v else None
+        except ValueError: return None
+    return Schedule(rec.get("id"), rec.get("pet_id"), rec.get("drug", ""), rec.get("dose", ""), rec.get("unit", ""),
+                    tuple(sorted(times)), _d(rec.get("start")) or default_start or date.min, _d(rec.get("end")), rec)
+
+def next_occurrence(s, after, inclusive=False):
+    """after 이후(inclusive면 같아도 됨) 첫 복용 시각, 기간이 끝났으면 None. O(log 시간 개수)"""
+    d, t = after.date(), after.time()
+    if d < s.start: d, t, inclusive = s.start, time.min, True
+    i = (bisect_left if inclusive else bisect_right)(s.times, t)
+    if i == len(s.times): d, i = d + timedelta(days=1), 0
+    if s.end and d > s.end: return None
+    return datetime.combine(d, s.times[i])
+
+def iter_occurrences(s, after, inclusive=True):
+    """복용 시각을 필요한 만큼만 만들어 내는 제너레이터 (종료일이 없으면 끝없이)"""
+    dt = next_occurrence(s, after, inclusive)
+    while dt is not None:
+        yield dt
+        dt = next_occurrence(s, dt)
+
+class ReminderQueue:
+    """여러 반려동물의 스케줄을 아우르는 다음 복용 시각 우선순위 큐.
+
+    힙에는 스케줄마다 '커서 이후 첫 복용' 한 건만 들어 있다. due()는 커서를
+    now까지 옮기며 지난 항목을 꺼내고, next_doses(n)은 힙을 건드리지 않고
+    힙 구조와 각 스케줄의 후속 시각을 k-way 병합해 O(n log n)에 상위 n건을 낸다
+    (스케줄 수와 무관). 삭제·수정은 세대 번호로 힙의 옛 항목을 무효화한다.
+    """
+
+    def __init__(self, records=(), now=None, window=timedelta(minutes=30)):
+        self.window = window
+        self._seq = itertools.count()
+        self._scheds, self._gen = {}, {}
+        self._recent = deque()   # 최근 window 안에 지난 (시각, seq, id, 세대), 시각 순
+        self.cursor = now or datetime.now()
+        heap = []
+        for rec in records:
+            s = parse_schedule(rec)
+            if s is None: continue
+            self._scheds[s.id] = s; self._gen[s.id] = 0
+            dt = next_occurrence(s, self.cursor - window)
+            if dt is not None: heap.append((dt, next(self._seq), s.id, 0))
+        heapq.heapify(heap)   # O(m)
+        self._heap = heap
+        self._advance(self.cursor)
+
+    def __len__(self):
+        return len(self._scheds)
+
+    def _live(self, entry):
+        return self._gen.get(entry[2]) == entry[3]
+
+    def add(self, rec):
+        """스케줄 추가/교체 (O(log m))"""
+        s = parse_schedule(rec)
+        sid = rec.get("id")
+        gen = self._gen.get(sid, -1) + 1
+        self._gen[sid] = gen
+        if s is None: self._scheds.pop(sid, None); return
+        self._scheds[sid] = s
+        dt = next_occurrence(s, self.cursor)
+        if dt is not None: heapq.heappush(self._heap, (dt, next(self._seq), sid, gen))
+
+    def remove(self, sid):
+        self._scheds.pop(sid, None)
+        if sid in self._gen: self._gen[sid] += 1
+
+    def _advance(self, now):
+        # 커서를 now까지 옮긴다. 지난 복용 중 window 안의 것은 _recent에 남긴다.
+        if now < self.cursor:   # 시계가 뒤로 갔으면 처음부터 다시
+            self.__init__([s.record for s in self._scheds.values()], now, self.window); return
+        floor = now - self.window
+        h = self._heap
+        while h and h[0][0] <= now:
+            entry = heapq.heappop(h)
+            if not self._live(entry): continue
+            dt, _, sid, gen = entry
+            s = self._scheds[sid]
+            if dt > floor: self._recent.append(entry)
+            # window보다 오래 밀린 복용은 건너뛰고 바로 floor 이후로
+            nxt = next_occurrence(s, max(dt, floor))
+            if nxt is not None: heapq.heappush(h, (nxt, next(self._seq), sid, gen))
+        while self._recent and self._recent[0][0] <= floor: self._recent.popleft()
+        self.cursor = now
+
+    def due(self, now):
+        """지금 복용할 약: (now - window, now] 사이 복용 시각의 (시각, Schedule) 목록.
+        비용은 결과 건수에 비례한다."""
+        self._advance(now)
+        return [(e[0], self._scheds[e[2]]) for e in self._recent if self._live(e)]
+
+    def next_doses(self, n, now=None):
+        """now 이후 가장 가까운 복용 n건 [(시각, Schedule), ...]"""
+        if now is not None: self._advance(now)
+        h, out = self._heap, []
+        aux = [(h[0][0], h[0][1], 0, 0)] if h else []   # (시각, seq, 0=힙 위치/1=후속, 값)
+        while aux and len(out) < n:
+            dt, _, kind, v = heapq.heappop(aux)
+            if kind == 0:
+                for c in (2*v + 1, 2*v + 2):
+                    if c < len(h): heapq.heappush(aux, (h[c][0], h[c][1], 0, c))
+                if not self._live(h[v]): continue
+                s = self._scheds[h[v][2]]
+            else:
+                s = v
+            out.append((dt, s))
+            nxt = next_occurrence(s, dt)
+            if nxt is not None: heapq.heappush(aux, (nxt, next(self._seq), 1, s))
+        return out
+
+def _ical_text(v):
+    return str(v).replace("\\", "\\\\").replace(";", "\\;").replace(",", "\\,").replace("\n", "\\n")
+
+def _fold(line):
+    # RFC 5545: 한 줄 75옥텟 이하, 이어지는 줄은 공백으로 시작
+    b = line.encode("utf-8")
+    if len(b) <= 75: return line + "\r\n"
+    parts, cur = [], b""
+    for ch in line:
+        c = ch.encode("utf-8")
+        if len(cur) + len(c) > (75 if not parts else 74): parts.append(cur.decode("utf-8")); cur = b""
+        cur += c
+    parts.append(cur.decode("utf-8"))
+    return "\r\n ".join(parts) + "\r\n"
+
+def ical_lines(records, pet_names=None, tzid="Asia/Seoul", utc_offset=timedelta(hours=9), stamp=None):
+    """복약 스케줄을 iCalendar 줄 단위로 내보내는 제너레이터.
+    복용 시간마다 RRULE:FREQ=DAILY 반복 일정 하나로 표현하므로, 종료일 없는
+    스케줄도 복용 시각을 하나하나 만들지 않는다."""
+    pet_names = pet_names or {}
+    stamp = (stamp or datetime.now(timezone.utc)).strftime("%Y%m%dT%H%M%SZ")
+    mins = int(utc_offset.total_seconds()) // 60
+    off = f"{'+' if mins >= 0 else '-'}{abs(mins)//60:02d}{abs(mins)%60:02d}"
+    yield from map(_fold, ["BEGIN:VCALENDAR", "VERSION:2.0", "PRODID:-//PetMate//Medication//KO",
+                           "CALSCALE:GREGORIAN", "BEGIN:VTIMEZONE", f"TZID:{tzid}", "BEGIN:STANDARD",
+                           "DTSTART:19700101T000000", f"TZOFFSETFROM:{off}", f"TZOFFSETTO:{off}",
+                           "END:STANDARD", "END:VTIMEZONE"])
+    for rec in records:
+        s = parse_schedule(rec)
+        if s is None: continue
+        start = s.start if s.start != date.min else date.today()
+        who = pet_names.get(s.pet_id, "")
+        for t in s.times:
+            lines = ["BEGIN:VEVENT", f"UID:{s.id}-{t.strftime('%H%M')}@petmate", f"DTSTAMP:{stamp}",
+                     f"DTSTART;TZID={tzid}:{datetime.combine(start, t):%Y%m%dT%H%M%S}", "DURATION:PT15M"]
+            rule = "RRULE:FREQ=DAILY"
+            if s.end: rule += f";UNTIL={datetime.combine(s.end, t) - utc_offset:%Y%m%dT%H%M%SZ}"   # UTC로 써야 함
+            lines += [rule, "SUMMARY:" + _ical_text(f"💊 {who} {s.drug} {s.dose}{s.unit}".replace("  ", " ").strip())]
+            if rec.get("notes"): lines.append("DESCRIPTION:" + _ical_text(rec["notes"]))
+            lines += ["BEGIN:VALARM", "ACTION:DISPLAY", "TRIGGER:PT0M", "DESCRIPTION:" + _ical_text(s.drug),
+                      "END:VALARM", "END:VEVENT"]
+            yield from map(_fold, lines)
+    yield _fold("END:VCALENDAR")
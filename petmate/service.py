@@ -0,0 +1,277 @@
+# PetMate 핵심 서비스: Streamlit 없이 데이터 작업을 수행 (Streamlit UI와 HTTP API가 함께 사용)
+import os, time, uuid, threading
+from datetime import datetime, date, timedelta
+from .auth import Authenticator, UserStore
+from .bulkio import clean_log_row
+from .events import KST, EventIndex, normalize_dt
+from .jsonstore import JsonStore, read_json
+from .logstore import LogStore, LOG_COLS
+from .nutrition import recommended_food_grams, recommended_water_ml
+from .partition import OWNED, owner_stores, plan_legacy, migrate_legacy
+from .reminders import ReminderQueue, parse_schedule
+from .unsafe_index import UnsafeIndex
+
+DEFAULT_UNSAFE = [{"category":"음식","name":"초콜릿","risk":"고위험","why":"카카오의 메틸잔틴(테오브로민) 독성"},
+                  {"category":"음식","name":"포도/건포도","risk":"고위험","why":"급성 신장손상 보고"}]
+EVENT_VIEWS = ("upcoming", "month", "future", "past")
+PHOTO_SWEEP_EVERY = 600   # 참조 없는 사진 정리는 이 간격(초)마다 한 번만
+
+class PetMateService:
+    """PetMate 데이터 작업 모음. 프로세스당 하나를 만들어 모든 세션·요청이 공유한다.
+
+    메서드는 여러 스레드에서 동시에 불러도 되고(저장소가 잠금을 처리),
+    잘못된 입력은 화면에 그대로 보여 줄 수 있는 메시지의 ValueError로 알린다.
+    owner 인자는 로그인한 사용자 아이디이며, 다른 사용자의 반려동물은 다룰 수 없다.
+    """
+
+    def __init__(self, data_dir):
+        self.data_dir = data_dir
+        os.makedirs(data_dir, exist_ok=True)
+        p = lambda name: os.path.join(data_dir, name)
+        self.legacy = {"pets": p("pets.json"), "med_schedule": p("med_schedule.json"),
+                       "hospital_events": p("hospital_events.json")}
+        self.logs = LogStore(p("logs.db"))
+        self.logs.migrate_csv("feed", p("feed_log.csv")); self.logs.migrate_csv("water", p("water_log.csv"))
+        self.unsafe = JsonStore(p("unsafe_db.json"), default=DEFAULT_UNSAFE)   # 모든 사용자가 공유
+        self.users = UserStore(p("users.jsonl"), legacy_path=p("users.json"))
+        self.auth = Authenticator(self.users)
+        plan_legacy(data_dir, self.legacy, self.users.usernames())   # 가입보다 먼저: 지금 있는 계정만 대상
+        self._unsafe_index = UnsafeIndex()
+        self._owners, self._lock = {}, threading.Lock()
+        self._photos = self._analytics = None
+        self._swept = 0.0
+
+    def stores(self, owner):
+        """owner의 파티션 저장소. 처음 열 때 예전 공용 파일의 레코드를 복사해 온다."""
+        if not owner: raise ValueError("로그인이 필요합니다.")
+        with self._lock:
+            if owner not in self._owners:
+                retired = migrate_legacy(self.data_dir, owner, self.legacy, adopt=self._adopt_legacy)
+                if retired is not None: self._retire_legacy(retired)
+                self._owners[owner] = owner_stores(self.data_dir, owner)
+            return self._owners[owner]
+
+    def _adopt_legacy(self, name, records, ids):
+        # 계정마다 새 id를 받은 pet은 섭취 로그도 복사해 계정끼리 기록을 나눠 쓰지 않게 하고,
+        # 사진은 참조 수를 세는 저장소로 옮겨 한 계정이 바꾸거나 지워도 다른 복사본에는 남게 한다
+        if name != "pets": return records
+        self.logs.copy_pets(ids)
+        for r in records:
+            legacy = r.get("photo_path")
+            if legacy and not r.get("photo_id") and os.path.exists(legacy):
+                with open(legacy, "rb") as f: r["photo_id"] = self.photos.put(f.read(), legacy)
+                r["photo_path"] = ""
+            if r.get("photo_id"): self.photos.retain(r["photo_id"])
+        return records
+
+    def _retire_legacy(self, old_ids):
+        # 모든 계정이 복사본을 받았으면 예전 id의 로그, 공용 레코드가 잡고 있던 사진 참조와 예전 사진 파일을 정리
+        for kind in LOG_COLS: self.logs.clear(kind, old_ids)
+        for r in read_json(self.legacy["pets"] + ".migrated", []):
+            if r.get("photo_id"): self.photos.release(r["photo_id"])
+            legacy = r.get("photo_path")
+            if legacy and os.path.exists(legacy): os.remove(legacy)
+
+    @property
+    def photos(self):
+        # Pillow가 필요한 사진 저장소는 실제로 쓸 때 연다 (API 서버는 사진을 다루지 않음)
+        if self._photos is None:
+            from .photos import PhotoStore
+            self._photos = PhotoStore(os.path.join(self.data_dir, "pet_photos"))
+        return self._photos
+
+    @property
+    def analytics(self):
+        # pandas/NumPy가 필요한 분석기도 처음 쓸 때 만든다. 기간별 캐시는 프로세스 전체가 공유.
+        if self._analytics is None:
+            from .analytics import NutritionAnalytics
+            self._analytics = NutritionAnalytics(self.logs)
+        return self._analytics
+
+    # ----- 반려동물 -----
+    def pets(self, owner):
+        return self.stores(owner)["pets"].load()
+
+    def pet_ids(self, owner):
+        return {p["id"] for p in self.pets(owner)}
+
+    def _own_pet(self, owner, pet_id):
+        if pet_id not in self.pet_ids(owner): raise ValueError(f"등록되지 않은 반려동물입니다: {pet_id}")
+
+    def _clean_pet(self, pet):
+        pet = dict(pet)
+        pet["name"] = str(pet.get("name", "")).strip()
+        if not pet["name"]: raise ValueError("이름은 필수입니다.")
+        try: pet["weight_kg"] = float(pet.get("weight_kg") or 0)
+        except (TypeError, ValueError): raise ValueError(f"{pet['name']}: 체중은 숫자여야 합니다.") from None
+        pet.setdefault("id", str(uuid.uuid4()))
+        for k in ("species", "breed", "birth", "notes", "photo_path", "photo_id"): pet.setdefault(k, "")
+        return pet
+
+    def save_pets(self, owner, pets=(), deletes=(), on_commit=None):
+        """여러 반려동물 추가/수정(id가 없으면 새로 만든다)과 삭제를 한 번의 쓰기로 반영하고
+        갱신된 목록을 반환. 하나라도 잘못되면 아무것도 쓰지 않는다. 사진 참조 수도 함께 옮긴다."""
+        pets = [self._clean_pet(p) for p in pets]
+        def move_photos(prior, _):
+            # 잠금 안에서 쓰기 직전 목록과 비교하므로 동시에 저장한 세션과 참조 수가 어긋나지 않는다
+            old = {p["id"]: p for p in prior}
+            for p in pets: self.swap_photo(old.get(p["id"], {}), p)
+            for pet_id in deletes: self.swap_photo(old.get(pet_id, {}), {})
+        records = self.stores(owner)["pets"].apply(upserts=pets, deletes=deletes,
+                                                   on_commit=on_commit, on_write=move_photos)
+        self.sweep_photos()
+        return records
+
+    def save_pet(self, owner, pet, on_commit=None):
+        return self.save_pets(owner, [pet], on_commit=on_commit)
+
+    def delete_pet(self, owner, pet_id):
+        return self.save_pets(owner, deletes=[pet_id])
+
+    def sweep_photos(self, force=False):
+        """저장되지 않은 업로드를 정리한다 (photos.PhotoStore.sweep). 자주 불러도
+        PHOTO_SWEEP_EVERY초에 한 번만 디렉터리를 훑는다. 지운 파일 수를 반환."""
+        now = time.monotonic()
+        with self._lock:
+            if not force and self._swept and now - self._swept < PHOTO_SWEEP_EVERY: return 0
+            self._swept = now
+        return self.photos.sweep()
+
+    def swap_photo(self, old, new):
+        """저장된 레코드(old -> new) 기준으로 사진 참조 수를 옮긴다.
+        예전 방식(uuid 파일명) 사진은 레코드마다 한 벌이므로 바뀌면 바로 지운다."""
+        if (old.get("photo_id") or "") != (new.get("photo_id") or ""):
+            self.photos.retain(new.get("photo_id")); self.photos.release(old.get("photo_id"))
+        legacy = old.get("photo_path")
+        if legacy and legacy != new.get("photo_path") and os.path.exists(legacy): os.remove(legacy)
+
+    # ----- 사료/급수 -----
+    def log_intake(self, owner, entries):
+        """여러 반려동물의 섭취 기록을 한 번에 추가.
+        entries: [{"pet_id", "kind": "feed"|"water", "amount", "date"(생략 시 오늘), "memo", "log_id"}, ...]
+        반환: {"inserted", "duplicates", "invalid", "errors": [(순번, 사유), ...]}"""
+        pet_ids, today = self.pet_ids(owner), datetime.now(KST).date().isoformat()
+        batches = {k: [] for k in LOG_COLS}
+        report = {"inserted": 0, "duplicates": 0, "invalid": 0, "errors": []}
+        for i, e in enumerate(entries):
+            try:
+                kind = e.get("kind")
+                if kind not in LOG_COLS: raise ValueError(f"kind는 feed 또는 water여야 합니다: {kind!r}")
+                row = dict(e, date=e.get("date") or today, log_id=e.get("log_id") or str(uuid.uuid4()))
+                batches[kind].append(clean_log_row(kind, row, pet_ids))
+            except (ValueError, AttributeError) as err:
+                report["invalid"] += 1; report["errors"].append((i, str(err)))
+        for kind, rows in batches.items():
+            if not rows: continue
+            n = self.logs.append(kind, rows)
+            report["inserted"] += n; report["duplicates"] += len(rows) - n
+        return report
+
+    def intake(self, pet, day=None):
+        """반려동물 한 마리의 하루 권장량/섭취량 (집계 테이블 조회 두 번)"""
+        day = day or datetime.now(KST).date().isoformat()
+        weight = float(pet.get("weight_kg", 0) or 0)
+        grams, snack_limit = recommended_food_grams(pet.get("species", ""), weight)
+        return {"pet_id": pet["id"], "name": pet.get("name", ""), "species": pet.get("species", ""), "date": day,
+                "food_target_g": grams, "snack_limit_g": snack_limit, "water_target_ml": recommended_water_ml(weight),
+                "eaten_g": self.logs.daily_total("feed", pet["id"], day),
+                "drank_ml": self.logs.daily_total("water", pet["id"], day)}
+
+    def dashboard_summary(self, owner, day=None):
+        """내 모든 반려동물의 오늘(또는 day) 요약"""
+        return [self.intake(p, day) for p in self.pets(owner)]
+
+    def health_report(self, owner, start=None, end=None):
+        """내 모든 반려동물의 기간 리포트 (기본: 오늘까지 7일). analytics.NutritionAnalytics.report 참고."""
+        end = end or datetime.now(KST).date()
+        start = start or date.fromisoformat(str(end)) - timedelta(days=6)
+        return self.analytics.report(self.pets(owner), start, end)
+
+    def clear_logs(self, owner):
+        ids = list(self.pet_ids(owner))   # 내 반려동물의 로그만
+        for kind in LOG_COLS: self.logs.clear(kind, ids)
+
+    # ----- 복약 -----
+    def meds(self, owner, pet_id=None):
+        meds = self.stores(owner)["med_schedule"].load()
+        return [m for m in meds if m["pet_id"] == pet_id] if pet_id else meds
+
+    def add_med(self, owner, pet_id, drug, times, dose="", unit="", start=None, end=None, notes=""):
+        """복용 시간(times)은 'HH:MM' 목록 또는 콤마로 구분한 문자열. 갱신된 목록을 반환."""
+        self._own_pet(owner, pet_id)
+        if isinstance(times, str): times = times.split(",")
+        rec = {"id": str(uuid.uuid4()), "pet_id": pet_id, "drug": str(drug).strip(),
+               "dose": str(dose).strip(), "unit": str(unit).strip(),
+               "times": [t.strip() for t in times if t.strip()],
+               "start": start.isoformat() if isinstance(start, date) else (start or ""),
+               "end": end.isoformat() if isinstance(end, date) else (end or ""),
+               "notes": str(notes).strip()}
+        if not rec["drug"] or not rec["times"]: raise ValueError("약 이름과 시간은 필수입니다.")
+        if parse_schedule(rec) is None: raise ValueError("복용 시간은 HH:MM 형식으로 입력해 주세요.")
+        return self.stores(owner)["med_schedule"].upsert(rec)
+
+    def delete_med(self, owner, med_id):
+        return self.stores(owner)["med_schedule"].delete(med_id)
+
+    def next_doses(self, owner, n=10, now=None):
+        now = now or datetime.now(KST).replace(tzinfo=None)
+        q = ReminderQueue(self.meds(owner), now)
+        return {"due": q.due(now), "next": q.next_doses(n)}
+
+    # ----- 병원 일정 -----
+    def add_event(self, owner, pet_id, title, dt, place="", notes="", on_commit=None):
+        """dt는 datetime 또는 ISO 문자열 (저장 시 KST로 정규화). (갱신된 목록, 새 일정)을 반환."""
+        self._own_pet(owner, pet_id)
+        title = str(title).strip()
+        if not title: raise ValueError("제목은 필수입니다.")
+        try: dt = normalize_dt(dt)
+        except (TypeError, ValueError): raise ValueError(f"일시 형식 오류: {dt!r}") from None
+        rec = {"id": str(uuid.uuid4()), "pet_id": pet_id, "title": title, "dt": dt,
+               "place": str(place).strip(), "notes": str(notes).strip()}
+        return self.stores(owner)["hospital_events"].upsert(rec, on_commit), rec
+
+    def delete_event(self, owner, event_id, on_commit=None):
+        return self.stores(owner)["hospital_events"].apply(deletes=[event_id], on_commit=on_commit)
+
+    def events(self, owner, pet_id, view="upcoming", page=0, size=10, now=None, index=None):
+        """view: upcoming(7일)/month/future/past. 반환: ([(일시, 일정), ...], 전체 건수)"""
+        if view not in EVENT_VIEWS: raise ValueError(f"view는 {', '.join(EVENT_VIEWS)} 중 하나여야 합니다.")
+        idx = index or EventIndex(self.stores(owner)["hospital_events"].load())
+        now = now or datetime.now(KST)
+        if view == "upcoming": return idx.upcoming(pet_id, now, page=page, size=size)
+        if view == "month": return idx.this_month(pet_id, now, page=page, size=size)
+        if view == "future": return idx.window(pet_id, now, page=page, size=size)
+        return idx.past(pet_id, now, page=page, size=size)
+
+    # ----- 위험 정보 -----
+    def unsafe_index(self):
+        """프로세스 전체가 공유하는 검색 인덱스 (파일이 바뀌었을 때만 재구성)"""
+        return self._unsafe_index.sync(self.unsafe.version(), self.unsafe.load)
+
+    def search_unsafe(self, q, limit=50):
+        return self.unsafe_index().search(q, limit=limit)
+
+    def add_unsafe(self, category, name, risk, why="", aliases=()):
+        idx = self.unsafe_index()
+        if isinstance(aliases, str): aliases = aliases.split(",")
+        item = {"id": str(uuid.uuid4()), "category": category, "name": str(name).strip(), "risk": risk,
+                "why": str(why).strip(), "aliases": [a.strip() for a in aliases if a.strip()]}
+        if not item["name"]: raise ValueError("이름은 필수입니다.")
+        def index_item(before, after):
+            # 인덱스가 직전 파일 버전과 같을 때만 한 건 반영, 아니면 다음 조회에서 재구성
+            if idx.version == before: idx.add(item, version=after)
+        self.unsafe.upsert(item, on_commit=index_item)
+        return item
+
+    # ----- 초기화 -----
+    def reset_owner(self, owner):
+        """owner의 프로필/복약/일정을 비운다 (사진 참조도 정리). 다른 사용자와 공용 DB는 그대로."""
+        stores = self.stores(owner)
+        def drop_photos(prior, _):
+            for p in prior: self.swap_photo(p, {})
+        for name in OWNED: stores[name].replace_all([], on_write=drop_photos if name == "pets" else None)
+        self.sweep_photos(force=True)
+
+    def reset_unsafe(self):
+        """모든 사용자가 함께 쓰는 위험 정보 DB를 비운다"""
+        self.unsafe.replace_all([])
@@ -0,0 +1,159 @@
+# 위험 정보 DB 검색 인덱스: 자모 n-gram + 초성 검색, 별칭/설명까지 순위 매겨 검색
+import heapq, threading, unicodedata
+
+CHO = "ㄱㄲㄴㄷㄸㄹㅁㅂㅃㅅㅆㅇㅈㅉㅊㅋㅌㅍㅎ"
+JUNG = ["ㅏ","ㅐ","ㅑ","ㅒ","ㅓ","ㅔ","ㅕ","ㅖ","ㅗ","ㅗㅏ","ㅗㅐ","ㅗㅣ","ㅛ","ㅜ","ㅜㅓ","ㅜㅔ","ㅜㅣ","ㅠ","ㅡ","ㅡㅣ","ㅣ"]
+JONG = ["","ㄱ","ㄲ","ㄱㅅ","ㄴ","ㄴㅈ","ㄴㅎ","ㄷ","ㄹ","ㄹㄱ","ㄹㅁ","ㄹㅂ","ㄹㅅ","ㄹㅌ","ㄹㅍ","ㄹㅎ",
+        "ㅁ","ㅂ","ㅂㅅ","ㅅ","ㅆ","ㅇ","ㅈ","ㅊ","ㅋ","ㅌ","ㅍ","ㅎ"]
+# 직접 입력한 겹자모(ㅘ, ㄳ …)도 음절을 분해한 결과와 같아지도록 풀어 쓴다
+COMPOUND = {"ㅘ":"ㅗㅏ","ㅙ":"ㅗㅐ","ㅚ":"ㅗㅣ","ㅝ":"ㅜㅓ","ㅞ":"ㅜㅔ","ㅟ":"ㅜㅣ","ㅢ":"ㅡㅣ",
+            "ㄳ":"ㄱㅅ","ㄵ":"ㄴㅈ","ㄶ":"ㄴㅎ","ㄺ":"ㄹㄱ","ㄻ":"ㄹㅁ","ㄼ":"ㄹㅂ","ㄽ":"ㄹㅅ",
+            "ㄾ":"ㄹㅌ","ㄿ":"ㄹㅍ","ㅀ":"ㄹㅎ","ㅄ":"ㅂㅅ"}
+RISK_ORDER = {"고위험":0,"중간-고위험":1,"주의":2}
+_UNBUILT = object()
+
+def _norm(text):
+    return "".join(unicodedata.normalize("NFC", str(text or "")).lower().split())
+
+def jamo_key(text):
+    """'초콜릿' -> 'ㅊㅗㅋㅗㄹㄹㅣㅅ'. 입력 중인 '초ㅋ'도 같은 규칙으로 'ㅊㅗㅋ'가 된다."""
+    out = []
+    for ch in _norm(text):
+        c = ord(ch) - 0xAC00
+        if 0 <= c < 11172:
+            out.append(CHO[c // 588]); out.append(JUNG[c % 588 // 28]); out.append(JONG[c % 28])
+        else:
+            out.append(COMPOUND.get(ch, ch))
+    return "".join(out)
+
+def chosung_key(text):
+    """'초콜릿' -> 'ㅊㅋㄹ' (한글이 아닌 글자는 그대로)"""
+    out = []
+    for ch in _norm(text):
+        c = ord(ch) - 0xAC00
+        out.append(CHO[c // 588] if 0 <= c < 11172 else ch)
+    return "".join(out)
+
+def aliases_of(item):
+    a = item.get("aliases") or []
+    if isinstance(a, str): a = a.split(",")
+    return [x.strip() for x in a if str(x).strip()]
+
+def _grams(key):
+    # 한 글자 검색도 되도록 1-gram과 2-gram을 함께 색인
+    return set(key) | {key[i:i+2] for i in range(len(key) - 1)}
+
+# (필드, 일치 방식) -> 점수. 이름 > 별칭 > 초성 > 설명 순
+_SCORES = {("name","exact"):100, ("name","prefix"):90, ("name","sub"):70,
+           ("alias","exact"):85, ("alias","prefix"):75, ("alias","sub"):55,
+           ("cho","exact"):65, ("cho","prefix"):60, ("cho","sub"):45,
+           ("why","exact"):20, ("why","prefix"):20, ("why","sub"):20}
+
+class UnsafeIndex:
+    """unsafe_db 항목에 대한 인메모리 n-gram 역색인.
+
+    항목마다 이름·별칭·설명의 자모 키와 이름·별칭의 초성 키를 만들고,
+    그 1/2-gram -> 항목 번호 집합을 유지한다(설명은 별도 posting). 검색은 질의
+    n-gram의 posting을 교집합해 후보를 줄인 뒤 후보만 실제 부분 문자열로 확인·채점한다.
+    add()로 항목 하나씩 반영할 수 있고, version은 원본 파일 버전을 기록한다.
+    """
+
+    def __init__(self, items=(), version=_UNBUILT):
+        self._lock = threading.RLock()
+        self._reset()
+        for it in items: self.add(it)
+        self.version = version
+
+    def _reset(self):
+        self._docs = []       # 번호 -> (item, [(field, key), ...]) 또는 삭제 시 None
+        self._by_id = {}      # item["id"] -> 번호
+        self._postings = {}   # gram -> {번호} (이름/별칭/초성)
+        self._why_postings = {}   # gram -> {번호} (설명)
+        self._sorted = None   # 검색어 없을 때 보여 줄 (분류, 위험도) 정렬 결과
+        self._live = 0
+
+    def sync(self, version, loader):
+        """원본 버전이 인덱스와 다르면 loader()의 항목으로 다시 만든다"""
+        if self.version == version: return self
+        with self._lock:
+            if self.version != version:
+                self._reset()
+                for it in loader(): self.add(it)
+                self.version = version
+        return self
+
+    def __len__(self):
+        return self._live
+
+    def _fields(self, item):
+        f = [("name", jamo_key(item.get("name"))), ("cho", chosung_key(item.get("name")))]
+        for a in aliases_of(item):
+            f.append(("alias", jamo_key(a))); f.append(("cho", chosung_key(a)))
+        f.append(("why", jamo_key(item.get("why"))))
+        return [(n, k) for n, k in f if k]
+
+    def add(self, item, version=None):
+        """항목 추가 (같은 id가 있으면 교체). version을 주면 인덱스 버전도 갱신."""
+        with self._lock:
+            if item.get("id") in self._by_id: self._remove(self._by_id[item["id"]])
+            n = len(self._docs)
+            fields = self._fields(item)
+            self._docs.append((item, fields))
+            if item.get("id"): self._by_id[item["id"]] = n
+            for field, key in fields:
+                postings = self._why_postings if field == "why" else self._postings
+                for g in _grams(key): postings.setdefault(g, set()).add(n)
+            self._sorted = None; self._live += 1
+            if version is not None: self.version = version
+
+    def _remove(self, n):
+        item, fields = self._docs[n]
+        for field, key in fields:
+            postings = self._why_postings if field == "why" else self._postings
+            for g in _grams(key):
+                p = postings.get(g)
+                if p:
+                    p.discard(n)
+                    if not p: del postings[g]
+        self._docs[n] = None; self._live -= 1
+        self._by_id.pop(item.get("id"), None)
+
+    def items(self):
+        """검색어가 없을 때의 목록: 분류, 위험도 순 (추가가 없으면 재정렬하지 않음)"""
+        with self._lock:
+            if self._sorted is None:
+                self._sorted = sorted((d[0] for d in self._docs if d),
+                                      key=lambda it: (str(it.get("category","기타")), str(it.get("risk","기타"))))
+            return self._sorted
+
+    def search(self, query, limit=50):
+        """점수 순 상위 limit개 항목. 같은 점수면 위험도가 높은 것, 이름이 짧은 것이 먼저."""
+        q = jamo_key(query)
+        if not q: return self.items()[:limit]
+        grams = {q} if len(q) == 1 else {q[i:i+2] for i in range(len(q) - 1)}
+        with self._lock:
+            cand = self._candidates(self._postings, grams)
+            if len(q) > 1: cand |= self._candidates(self._why_postings, grams)   # 설명은 두 자모 이상부터
+            scored = []
+            for n in cand:
+                item, fields = self._docs[n]
+                best = 0
+                for field, key in fields:
+                    if field == "why" and len(q) == 1: continue
+                    pos = key.find(q)
+                    if pos < 0: continue
+                    how = "exact" if key == q else "prefix" if pos == 0 else "sub"
+                    best = max(best, _SCORES[(field, how)])
+                if best:
+                    scored.append((-best, RISK_ORDER.get(item.get("risk"), 3), len(item.get("name", "")),
+                                   item.get("name", ""), n))
+            return [self._docs[s[-1]][0] for s in heapq.nsmallest(limit, scored)]
+
+    @staticmethod
+    def _candidates(postings, grams):
+        grams = sorted(grams, key=lambda g: len(postings.get(g, ())))   # 작은 posting부터 교집합
+        cand = set(postings.get(grams[0], ()))
+        for g in grams[1:]:
+            if not cand: break
+            cand &= postings.get(g, set())
+        return cand
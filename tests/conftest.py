@@ -0,0 +1,4 @@
+# 저장소 루트를 import 경로에 넣는다 (benchmarks/와 같은 방식, 설치 없이 python -m pytest)
+import os, sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
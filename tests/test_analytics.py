@@ -0,0 +1,84 @@
+# NutritionAnalytics: 캐시된 기간 행렬을 고쳐 쓴 결과(warm)가 처음부터 만든 결과(cold)와 같은지
+import random
+from datetime import date, timedelta
+import pytest
+
+pd = pytest.importorskip("pandas")
+from petmate import analytics
+from petmate.analytics import NutritionAnalytics, LOW_WATER_DAYS
+from petmate.logstore import LogStore
+
+START = date(2025, 3, 1)
+RANGES = [(START, START + timedelta(days=6)), (START + timedelta(days=3), START + timedelta(days=20)),
+          (START, START)]
+
+def _pet(i, rnd):
+    return {"id": f"p{i}", "name": f"pet{i}", "species": rnd.choice(("개", "고양이")), "weight_kg": rnd.choice((0, 2.5, 8, 20))}
+
+def _append(logs, rnd, pets, n):
+    rows = {"feed": [], "water": []}
+    for _ in range(n):
+        kind = rnd.choice(("feed", "water"))
+        rows[kind].append({"log_id": f"l{rnd.getrandbits(64)}", "pet_id": rnd.choice(pets)["id"],
+                           "date": (START + timedelta(days=rnd.randint(-3, 25))).isoformat(),   # 기간 밖도 섞는다
+                           "amount_g" if kind == "feed" else "amount_ml": rnd.randint(0, 900), "memo": ""})
+    for kind, r in rows.items(): logs.append(kind, r)
+
+def _assert_same(warm, cold, pets, start, end):
+    a, b = warm.report(pets, start, end), cold.report(pets, start, end)
+    for k in ("daily", "summary", "anomalies"): pd.testing.assert_frame_equal(a[k], b[k])
+
+@pytest.mark.parametrize("seed", range(3))
+def test_incremental_matches_rebuild(tmp_path, seed):
+    rnd = random.Random(seed)
+    logs = LogStore(str(tmp_path / "logs.db"))
+    pets = [_pet(i, rnd) for i in range(6)]
+    warm = NutritionAnalytics(logs)
+    _append(logs, rnd, pets, 200)
+    for step in range(25):
+        r = rnd.random()
+        if r < 0.5: _append(logs, rnd, pets, rnd.randint(1, 30))
+        elif r < 0.7:   # 일부 반려동물의 기록 전체 삭제 -> 집계는 n=0으로 남는다
+            logs.clear(rnd.choice(("feed", "water")), [p["id"] for p in rnd.sample(pets, rnd.randint(1, 2))])
+        elif r < 0.85:  # 새 반려동물: 캐시된 행렬에 없는 행
+            pets.append(_pet(len(pets), rnd)); _append(logs, rnd, pets[-1:], rnd.randint(1, 10))
+        start, end = rnd.choice(RANGES)
+        _assert_same(warm, NutritionAnalytics(logs), rnd.sample(pets, rnd.randint(1, len(pets))), start, end)
+
+def test_evicted_range_is_rebuilt(tmp_path, monkeypatch):
+    monkeypatch.setattr(analytics, "CACHE_RANGES", 2)
+    rnd = random.Random(0)
+    logs = LogStore(str(tmp_path / "logs.db"))
+    pets = [_pet(i, rnd) for i in range(3)]
+    warm = NutritionAnalytics(logs)
+    _append(logs, rnd, pets, 100)
+    for start, end in RANGES: warm.report(pets, start, end)
+    assert len(warm._blocks) == 2 and RANGES[0] not in warm._blocks
+    _append(logs, rnd, pets, 50)
+    for start, end in RANGES: _assert_same(warm, NutritionAnalytics(logs), pets, start, end)
+
+def test_water_low_reported_once_at_threshold(tmp_path):
+    logs = LogStore(str(tmp_path / "logs.db"))
+    pet = {"id": "p", "name": "콩이", "species": "개", "weight_kg": 5}   # 급수 권장 300 ml
+    low = LOW_WATER_DAYS - 1
+    # 부족 (LOW_WATER_DAYS-1)일 -> 충분 1일 -> 부족 LOW_WATER_DAYS+1일
+    amounts = [100] * low + [400] + [100] * (LOW_WATER_DAYS + 1)
+    logs.append("water", [{"log_id": f"w{i}", "pet_id": "p", "date": (START + timedelta(days=i)).isoformat(),
+                           "amount_ml": a, "memo": ""} for i, a in enumerate(amounts)])
+    rep = NutritionAnalytics(logs).report([pet], START, START + timedelta(days=len(amounts) - 1))
+    a = rep["anomalies"]
+    assert list(a["type"]) == ["water_low"]
+    assert a["date"].iloc[0] == START + timedelta(days=low + LOW_WATER_DAYS)   # 연속 일수가 기준에 닿은 날
+    assert a["value"].iloc[0] == 100 and a["target"].iloc[0] == 300
+    assert rep["summary"].loc["p", "water_low_max"] == LOW_WATER_DAYS + 1
+
+def test_days_without_logs_break_nothing(tmp_path):
+    # 기록이 없는 날은 NaN: 부족 연속 일수를 끊고, 평균·과식 판단에서 빠진다
+    logs = LogStore(str(tmp_path / "logs.db"))
+    pet = {"id": "p", "name": "콩이", "species": "개", "weight_kg": 5}
+    days = [0, 1, 3, 4]   # 2일째는 기록 없음
+    logs.append("water", [{"log_id": f"w{d}", "pet_id": "p", "date": (START + timedelta(days=d)).isoformat(),
+                           "amount_ml": 100, "memo": ""} for d in days])
+    rep = NutritionAnalytics(logs, low_water_days=3).report([pet], START, START + timedelta(days=4))
+    assert rep["anomalies"].empty
+    assert list(rep["daily"]["water_low_days"]) == [1, 2, 0, 1, 2]
@@ -0,0 +1,82 @@
+# HTTP API: 계정별 API 키 인증(401/403), 여러 건 한 번에 기록, 잘못된 요청은 400
+import asyncio, json
+import pytest
+from petmate.api import PetMateAPI
+from petmate.service import PetMateService
+
+def _call(svc, *requests):
+    """서버를 임시 포트로 띄워 (method, path, body, headers) 요청들을 차례로 보내고 (status, json) 목록을 반환"""
+    async def run():
+        server = await asyncio.start_server(PetMateAPI(svc).handle, "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        out = []
+        async with server:
+            for method, path, body, headers in requests:
+                reader, writer = await asyncio.open_connection("127.0.0.1", port)
+                data = json.dumps(body).encode() if body is not None else b""
+                head = {"Content-Length": str(len(data)), "Connection": "close", **headers}
+                writer.write(f"{method} {path} HTTP/1.1\r\n".encode() +
+                             "".join(f"{k}: {v}\r\n" for k, v in head.items()).encode() + b"\r\n" + data)
+                await writer.drain()
+                raw = await reader.read()
+                writer.close()
+                status_line, _, rest = raw.partition(b"\r\n")
+                out.append((int(status_line.split()[1]), json.loads(rest.partition(b"\r\n\r\n")[2])))
+        return out
+    return asyncio.run(run())
+
+def _get(path, key=None, **headers):
+    if key: headers["Authorization"] = f"Bearer {key}"
+    return ("GET", path, None, headers)
+
+@pytest.fixture
+def svc(tmp_path):
+    svc = PetMateService(str(tmp_path))
+    for u in ("a", "b"): svc.auth.signup(u, "pw")
+    return svc
+
+def test_keys_are_per_account(svc):
+    ka, kb = svc.auth.issue_api_key("a"), svc.auth.issue_api_key("b")
+    res = _call(svc, _get("/health"), _get("/v1/owners/a/pets"), _get("/v1/owners/a/pets", "pm_wrong"),
+                _get("/v1/owners/a/pets", kb), _get("/v1/owners/a/pets", ka), _get("/v1/owners/zz/pets", ka),
+                _get("/v1/owners/a/pets", ka.lower(), Authorization=f"Token {ka}"))
+    assert [s for s, _ in res] == [200, 401, 401, 403, 200, 403, 401]
+    assert res[4][1] == []
+    new = svc.auth.issue_api_key("a")   # 다시 발급하면 이전 키는 무효
+    assert [s for s, _ in _call(svc, _get("/v1/owners/a/pets", ka), _get("/v1/owners/a/pets", new))] == [401, 200]
+    with pytest.raises(ValueError): svc.auth.issue_api_key("nobody")
+
+def test_batched_intake(svc):
+    key = svc.auth.issue_api_key("a")
+    p1, p2 = (svc.save_pet("a", {"name": n, "species": "개"})[-1]["id"] for n in ("콩이", "보리"))
+    other = svc.save_pet("b", {"name": "나비", "species": "고양이"})[0]["id"]
+    entries = [{"pet_id": p1, "kind": "feed", "amount": 40, "date": "2025-03-01", "log_id": "x1"},
+               {"pet_id": p1, "kind": "feed", "amount": 60, "date": "2025-03-01"},
+               {"pet_id": p2, "kind": "water", "amount": 200, "date": "2025-03-01"},
+               {"pet_id": p2, "kind": "snack", "amount": 1},
+               {"pet_id": other, "kind": "feed", "amount": 1},
+               "문자열"]
+    auth = {"Authorization": f"Bearer {key}"}
+    (s1, r1), (s2, r2), (s3, r3) = _call(svc, ("POST", "/v1/owners/a/intake", {"entries": entries}, auth),
+                                         ("POST", "/v1/owners/a/intake", [entries[0]], auth),
+                                         ("POST", "/v1/owners/a/intake", {"entries": "x"}, auth))
+    assert s1 == 200 and (r1["inserted"], r1["duplicates"], r1["invalid"]) == (3, 0, 3)
+    assert [i for i, _ in r1["errors"]] == [3, 4, 5]
+    assert s2 == 200 and (r2["inserted"], r2["duplicates"]) == (0, 1)   # log_id로 재전송 안전
+    assert s3 == 400
+    assert svc.logs.daily_total("feed", p1, "2025-03-01") == 100
+    assert svc.logs.daily_total("water", p2, "2025-03-01") == 200
+    assert svc.logs.daily_total("feed", other, "2025-03-01") == 0
+
+def test_bad_requests(svc):
+    key = svc.auth.issue_api_key("a")
+    pet = svc.save_pet("a", {"name": "콩이", "species": "개"})[0]["id"]
+    ev = f"/v1/owners/a/events?pet_id={pet}&view=future"
+    res = _call(svc, _get(ev + "&page=-1", key), _get(ev + "&size=0", key), _get(ev + "&size=x", key),
+                _get(ev + "&size=1000", key), _get("/v1/unsafe?limit=0", key), _get("/v1/owners/a/meds/next?n=0", key),
+                _get("/v1/owners/a/pets", key, **{"Content-Length": "abc"}),
+                _get("/v1/owners/a/pets", key, **{"Content-Length": "-5"}),
+                ("POST", "/v1/owners/a/pets", None, {"Authorization": f"Bearer {key}"}),
+                _get("/v1/nothing", key))
+    assert [s for s, _ in res] == [400, 400, 400, 200, 400, 400, 400, 400, 405, 404]
+    assert res[3][1]["size"] == 100
@@ -0,0 +1,74 @@
+# 인증: 해시 형식과 재해시, 실패 횟수 제한, users.json -> users.jsonl 이전, API 키 교체
+import hashlib, json, os
+import pytest
+from petmate import auth
+from petmate.auth import Authenticator, RateLimiter, UserStore, hash_password, needs_rehash, verify_password
+
+def _auth(tmp_path, limiter=None):
+    return Authenticator(UserStore(str(tmp_path / "users.jsonl"), str(tmp_path / "users.json")), limiter)
+
+def _sha(pw): return hashlib.sha256(pw.encode()).hexdigest()
+
+def test_hash_formats_and_rehash():
+    h = hash_password("pw", n=2**10)
+    assert verify_password("pw", h) and not verify_password("px", h)
+    assert needs_rehash(h) and not needs_rehash(hash_password("pw"))   # 지금 설정보다 약하면 다시 해시
+    assert verify_password("pw", _sha("pw")) and needs_rehash(_sha("pw"))
+    for broken in ("", "scrypt$x", "md5$1$2", "a" * 63): assert not verify_password("pw", broken)
+
+def test_legacy_users_are_migrated_and_upgraded_on_login(tmp_path):
+    (tmp_path / "users.json").write_text(json.dumps([{"username": "a", "password": _sha("pw")},
+                                                     {"username": "b", "password": _sha("pw2")}, {"password": "x"}]))
+    a = _auth(tmp_path)
+    assert not (tmp_path / "users.json").exists() and (tmp_path / "users.json.migrated").exists()
+    assert sorted(a.store.usernames()) == ["a", "b"]
+    assert not a.login("a", "wrong") and a.login("a", "pw")
+    upgraded = a.store.get("a")["password"]
+    assert upgraded.startswith(("scrypt$", "pbkdf2_sha256$")) and not needs_rehash(upgraded)
+    assert a.store.get("b")["password"] == _sha("pw2")   # 로그인하지 않은 계정은 그대로
+    again = _auth(tmp_path)   # 다시 열어도 덧붙인 줄이 앞의 줄을 대신한다
+    assert again.store.get("a")["password"] == upgraded and again.login("a", "pw")
+    with open(tmp_path / "users.jsonl") as f: assert len(f.readlines()) == 3
+
+def test_signup_rejects_duplicates_and_blanks(tmp_path):
+    a = _auth(tmp_path)
+    a.signup("a", "pw")
+    with pytest.raises(ValueError): a.signup("a", "other")
+    with pytest.raises(ValueError): a.signup("", "pw")
+    assert a.login("a", "pw") and not a.login("nobody", "pw")
+
+def test_rate_limit_lockout_and_reset(tmp_path):
+    a = _auth(tmp_path, RateLimiter(max_failures=3, window=300))
+    a.signup("a", "pw")
+    assert not a.login("a", "x") and not a.login("a", "x") and a.login("a", "pw")   # 성공하면 다시 0부터
+    for _ in range(3): assert not a.login("a", "x")
+    with pytest.raises(ValueError, match="초 후"): a.login("a", "pw")   # 맞는 비밀번호도 막힌다
+    assert a.login("b", "x") is False   # 다른 아이디는 상관없음
+    a.limiter.reset("a")
+    assert a.login("a", "pw")
+
+def test_rate_limiter_window_and_memory():
+    rl = RateLimiter(max_failures=3, window=100)
+    for t in (1, 2, 50, 60): rl.failed("a", now=t)
+    assert len(rl._fails["a"]) == 3   # 최근 max_failures번만 기억
+    assert rl.retry_after("a", now=61) == pytest.approx(41)   # 최근 3번 중 가장 오래된 t=2가 창을 벗어날 때까지
+    assert rl.retry_after("a", now=103) == 0
+    for i in range(1000): rl.failed(f"u{i}", now=200)
+    rl.failed("late", now=400)   # window가 지난 뒤 첫 실패에서 오래된 키를 정리
+    assert set(rl._fails) == {"late"}
+
+def test_api_key_replacement(tmp_path):
+    a = _auth(tmp_path)
+    a.signup("a", "pw"); a.signup("b", "pw")
+    k1 = a.issue_api_key("a")
+    k2 = a.issue_api_key("a")
+    kb = a.issue_api_key("b")
+    assert k1 != k2 and a.api_user(k1) is None and a.api_user(k2) == "a" and a.api_user(kb) == "b"
+    assert a.api_user("") is None and a.api_user("pm_unknown") is None
+    assert k2 not in (tmp_path / "users.jsonl").read_text()   # 파일에는 해시만
+    assert a.login("a", "pw")   # 키를 바꿔도 비밀번호는 그대로
+    fresh = _auth(tmp_path)
+    assert fresh.api_user(k1) is None and fresh.api_user(k2) == "a"
+    fresh.store.clear()
+    assert a.api_user(k2) is None and len(a.store) == 0
+    with pytest.raises(ValueError): a.issue_api_key("a")
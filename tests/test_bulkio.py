@@ -0,0 +1,73 @@
+# 대량 가져오기/내보내기: 행 검증, 내용 기반 중복 제거, 청크 단위 처리, zip 왕복
+import io, json, zipfile
+import pytest
+from petmate.bulkio import clean_log_row, import_logs, export_archive
+from petmate.logstore import LogStore
+
+HEADER = "pet_id,date,amount_g,memo\n"
+
+def _csv(*lines):
+    return io.BytesIO(("﻿" + HEADER + "".join(l + "\n" for l in lines)).encode("utf-8"))
+
+def test_clean_log_row_validation():
+    assert clean_log_row("feed", {"pet_id": "p1", "date": "2025-03-01T08:00", "amount": "40.0"})["date"] == "2025-03-01"
+    for row, msg in [({"date": "2025-03-01", "amount_g": 1}, "pet_id"),
+                     ({"pet_id": "zz", "date": "2025-03-01", "amount_g": 1}, "등록되지"),
+                     ({"pet_id": "p1", "date": "3/1", "amount_g": 1}, "날짜"),
+                     ({"pet_id": "p1", "date": "2025-03-01", "amount_g": "많이"}, "amount_g"),
+                     ({"pet_id": "p1", "date": "2025-03-01", "amount_g": -5}, "0 이상")]:
+        with pytest.raises(ValueError, match=msg): clean_log_row("feed", row, {"p1"})
+    # 시각이 다르면 같은 양이라도 다른 기록
+    a = clean_log_row("feed", {"pet_id": "p1", "date": "2025-03-01T08:00", "amount_g": 40})
+    b = clean_log_row("feed", {"pet_id": "p1", "date": "2025-03-01T18:00", "amount_g": 40})
+    assert a["log_id"] != b["log_id"]
+
+def test_import_reports_invalid_rows_and_dedups_reimport(tmp_path):
+    logs = LogStore(str(tmp_path / "logs.db"))
+    data = ["p1,2025-03-01,40,", "p2,2025-03-01,10,", "p1,2025-03-02,x,", "p1,2025-03-02,30,간식"]
+    r = import_logs(logs, "feed", _csv(*data), pet_ids=["p1"])
+    assert (r["rows"], r["inserted"], r["duplicates"], r["invalid"]) == (4, 2, 0, 2)
+    assert [line for line, _ in r["errors"]] == [3, 4]   # 헤더가 1행
+    r = import_logs(logs, "feed", _csv(*data), pet_ids=["p1"])
+    assert (r["inserted"], r["duplicates"]) == (0, 2)
+    assert logs.daily_totals("feed", "p1") == {"2025-03-01": 40, "2025-03-02": 30}
+
+def test_identical_rows_in_one_file_are_all_kept(tmp_path):
+    logs = LogStore(str(tmp_path / "logs.db"))
+    data = ["p1,2025-03-01,40,"] * 3 + ["p1,2025-03-02,40,"]
+    assert import_logs(logs, "feed", _csv(*data))["inserted"] == 4
+    assert logs.daily_total("feed", "p1", "2025-03-01") == 120
+    # 다시 가져오면 반복 기록까지 모두 중복, 반복이 하나 늘어난 파일은 늘어난 것만 추가
+    assert import_logs(logs, "feed", _csv(*data))["inserted"] == 0
+    assert import_logs(logs, "feed", _csv(*(data + ["p1,2025-03-01,40,"])))["inserted"] == 1
+    assert logs.daily_total("feed", "p1", "2025-03-01") == 160
+
+def test_chunks_and_progress(tmp_path):
+    logs = LogStore(str(tmp_path / "logs.db"))
+    lines = [json.dumps({"pet_id": "p1", "date": f"2025-03-{d:02d}", "amount_ml": i}) for d in range(1, 11) for i in range(25)]
+    lines.insert(7, "{깨진 줄")
+    body = "\n".join(lines) + "\n"
+    calls = []
+    r = import_logs(logs, "water", io.StringIO(body), fmt="jsonl", chunk_size=100,
+                    progress=lambda rows, nbytes: calls.append((rows, nbytes)))
+    assert (r["rows"], r["inserted"], r["invalid"]) == (251, 250, 1)
+    assert r["errors"] == [(8, "JSON 형식 오류")]
+    assert [c[0] for c in calls] == [101, 201, 251]
+    assert calls[-1][1] == len(body.encode("utf-8"))
+    with pytest.raises(ValueError): import_logs(logs, "water", io.StringIO(""), fmt="xml")
+
+def test_import_leaves_caller_stream_open(tmp_path):
+    f = _csv("p1,2025-03-01,40,")
+    import_logs(LogStore(str(tmp_path / "logs.db")), "feed", f)
+    assert not f.closed
+
+def test_export_archive_round_trip(tmp_path):
+    logs = LogStore(str(tmp_path / "logs.db"))
+    import_logs(logs, "feed", _csv("p1,2025-03-01,40,", "p2,2025-03-01,10,"))
+    buf = io.BytesIO()
+    manifest = export_archive(buf, logs, {"pets": [{"id": "p1"}]}, pet_ids=["p1"])
+    assert manifest["counts"] == {"feed_log": 1, "water_log": 0, "pets": 1}
+    with zipfile.ZipFile(io.BytesIO(buf.getvalue())) as zf:
+        other = LogStore(str(tmp_path / "other.db"))
+        assert import_logs(other, "feed", zf.open("feed_log.csv"))["inserted"] == 1
+    assert other.query("feed") == logs.query("feed", pet_id="p1")
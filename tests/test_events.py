@@ -0,0 +1,88 @@
+# 병원 일정 인덱스: 기간 조회와 (역순) 페이지를 단순 정렬·필터 결과와 비교
+import random
+from datetime import datetime, timedelta, timezone
+import pytest
+from petmate.events import KST, EventIndex, month_range, normalize_dt, parse_dt
+
+BASE = datetime(2025, 3, 1, 9, 0, tzinfo=KST)
+
+def _events(n, seed=1):
+    rng = random.Random(seed)
+    return [{"id": f"e{i:03d}", "pet_id": rng.choice(["p1", "p2"]), "title": str(i),
+             "dt": normalize_dt(BASE + timedelta(hours=rng.randrange(-24 * 40, 24 * 40)))} for i in range(n)]
+
+def _expected(events, pet, start=None, end=None):
+    hits = [(parse_dt(e["dt"]), e["id"]) for e in events if e["pet_id"] == pet]
+    return [i for dt, i in sorted(hits) if (start is None or dt >= start) and (end is None or dt < end)]
+
+def _pages(idx, pet, start, end, size, reverse=False):
+    out, page = [], 0
+    while True:
+        rows, total = idx.window(pet, start, end, page=page, size=size, reverse=reverse)
+        if not rows: return out, total
+        assert len(rows) <= size
+        out += [e["id"] for _, e in rows]; page += 1
+
+def test_windows_and_pages_match_brute_force():
+    events = _events(200)
+    idx = EventIndex(events)
+    rng = random.Random(7)
+    for _ in range(30):
+        a, b = sorted(BASE + timedelta(hours=rng.randrange(-24 * 45, 24 * 45)) for _ in range(2))
+        start, end = rng.choice([(a, b), (None, b), (a, None), (None, None)])
+        size = rng.choice([1, 3, 10])
+        want = _expected(events, "p1", start, end)
+        assert idx.count("p1", start, end) == len(want)
+        assert _pages(idx, "p1", start, end, size) == (want, len(want))
+        assert _pages(idx, "p1", start, end, size, reverse=True) == (want[::-1], len(want))
+
+def test_views_relative_to_now():
+    events = _events(120)
+    idx = EventIndex(events)
+    now = BASE + timedelta(days=3, minutes=30)
+    ids = lambda r: [e["id"] for _, e in r[0]]
+    assert ids(idx.upcoming("p2", now, size=100)) == _expected(events, "p2", now, now + timedelta(days=7))
+    assert ids(idx.this_month("p2", now, size=100)) == _expected(events, "p2", *month_range(now))
+    assert ids(idx.past("p2", now, size=5)) == _expected(events, "p2", None, now)[::-1][:5]
+    assert idx.past("p2", now, page=1000, size=5)[0] == []
+
+def test_incremental_add_remove_matches_rebuild():
+    events = _events(80, seed=2)
+    idx = EventIndex(events[:40])
+    for e in events[40:]: idx.add(e)
+    moved = dict(events[0], dt=normalize_dt(BASE + timedelta(days=90)), pet_id="p2")
+    idx.add(moved)   # 같은 id는 일시·pet을 옮겨 교체
+    for e in events[10:20]: idx.remove(e["id"])
+    idx.remove("없는 id")
+    live = [moved] + events[1:10] + events[20:]
+    fresh = EventIndex(live)
+    assert len(idx) == len(fresh) == len(live)
+    for pet in ("p1", "p2"):
+        assert _pages(idx, pet, None, None, 7) == _pages(fresh, pet, None, None, 7)
+
+def test_timezones_and_broken_dates():
+    idx = EventIndex([{"id": "naive", "pet_id": "p", "dt": "2025-03-01T09:00"},
+                      {"id": "utc", "pet_id": "p", "dt": "2025-03-01T00:30:00+00:00"},
+                      {"id": "bad", "pet_id": "p", "dt": "3월 1일"},
+                      {"id": "none", "pet_id": "p"}])
+    assert len(idx) == 2
+    rows, _ = idx.window("p", size=10)
+    assert [e["id"] for _, e in rows] == ["naive", "utc"]   # 시간대 없는 값은 KST로 본다
+    assert rows[1][0] == datetime(2025, 3, 1, 9, 30, tzinfo=KST)
+    assert normalize_dt(datetime(2025, 3, 1, 0, 0, tzinfo=timezone.utc)) == "2025-03-01T09:00:00+09:00"
+
+def test_month_range_crosses_year():
+    start, end = month_range(datetime(2025, 12, 31, 23, 59, tzinfo=KST))
+    assert (start.day, start.hour, end.year, end.month, end.day) == (1, 0, 2026, 1, 1)
+
+def test_service_events(tmp_path):
+    from petmate.service import PetMateService
+    svc = PetMateService(str(tmp_path))
+    pet = svc.save_pet("u", {"name": "콩이", "species": "개"})[0]["id"]
+    for d in (-2, 1, 3, 20):
+        svc.add_event("u", pet, f"D{d:+d}", (BASE + timedelta(days=d)).replace(tzinfo=None).isoformat())
+    titles = lambda view, **kw: [e["title"] for _, e in svc.events("u", pet, view, now=BASE, **kw)[0]]
+    assert titles("upcoming") == ["D+1", "D+3"]
+    assert titles("future", page=1, size=2) == ["D+20"]
+    assert titles("past") == ["D-2"]
+    with pytest.raises(ValueError): svc.events("u", pet, "week")
@@ -0,0 +1,50 @@
+# JsonStore: 잠금 안에서 최신 내용 기준으로 고치므로 동시에 써도 잃어버리는 변경이 없어야 한다
+import json, os, threading
+from multiprocessing import Pool
+from petmate.jsonstore import JsonStore, read_json
+
+def _worker(args):
+    path, wid, n = args
+    store = JsonStore(path)
+    for i in range(n):
+        store.apply(upserts=[{"id": f"{wid}-{i}", "v": 0}])
+        store.apply(upserts=[{"id": f"{wid}-{i}", "v": 1}], deletes=[f"{wid}-{i - 1}"] if i % 2 else [])
+
+def _expected(workers, n):
+    return {f"{w}-{i}" for w in workers for i in range(n) if not (i % 2 == 0 and i + 1 < n)}
+
+def test_concurrent_threads_lose_no_updates(tmp_path):
+    path = str(tmp_path / "pets.json")
+    threads = [threading.Thread(target=_worker, args=((path, f"t{t}", 20),)) for t in range(8)]
+    for t in threads: t.start()
+    for t in threads: t.join()
+    recs = JsonStore(path).load()
+    assert {r["id"] for r in recs} == _expected([f"t{t}" for t in range(8)], 20)
+    assert all(r["v"] == 1 for r in recs) and len(recs) == len({r["id"] for r in recs})
+
+def test_concurrent_processes_lose_no_updates(tmp_path):
+    path = str(tmp_path / "pets.json")
+    with Pool(3) as pool: pool.map(_worker, [(path, f"p{w}", 15) for w in range(3)])
+    with open(path, encoding="utf-8") as f: recs = json.load(f)
+    assert {r["id"] for r in recs} == _expected([f"p{w}" for w in range(3)], 15)
+
+def test_corrupt_file_is_quarantined(tmp_path):
+    path = tmp_path / "pets.json"
+    path.write_text('[{"id": "a"', encoding="utf-8")
+    store = JsonStore(str(path), default=[{"id": "default"}])
+    assert store.load() == [{"id": "default"}]
+    kept = [p for p in os.listdir(tmp_path) if p.startswith("pets.json.corrupt-")]
+    assert len(kept) == 1 and (tmp_path / kept[0]).read_text(encoding="utf-8") == '[{"id": "a"'
+    store.upsert({"id": "b"})   # 다음 저장은 기본값 위에서, 깨진 원본은 그대로 남는다
+    assert [r["id"] for r in read_json(str(path), [])] == ["default", "b"]
+
+def test_version_changes_on_write_and_committed_version_is_per_thread(tmp_path):
+    store = JsonStore(str(tmp_path / "pets.json"))
+    assert store.version() is None
+    store.upsert({"id": "a"})
+    mine = store.committed_version()
+    assert mine == store.version()
+    other = []
+    t = threading.Thread(target=lambda: (store.upsert({"id": "b"}), other.append(store.committed_version())))
+    t.start(); t.join()
+    assert store.committed_version() == mine != store.version() == other[0]
@@ -0,0 +1,96 @@
+# LogStore: 행 단위 추가, 조회, CSV 이전
+import csv, random, sqlite3
+import pytest
+from petmate.logstore import LogStore, LOG_COLS
+
+def _feed(i, pet="p1", day="2025-03-01", amount=10):
+    return {"log_id": f"f{i}", "pet_id": pet, "date": day, "amount_g": amount, "memo": ""}
+
+def test_append_ignores_existing_log_ids(tmp_path):
+    logs = LogStore(str(tmp_path / "logs.db"))
+    assert logs.append("feed", [_feed(1), _feed(2)]) == 2
+    assert logs.append("feed", [_feed(2), _feed(3)]) == 1
+    assert logs.count("feed") == 3 and logs.count("water") == 0
+
+def test_query_filters_and_keeps_insert_order(tmp_path):
+    logs = LogStore(str(tmp_path / "logs.db"))
+    logs.append("feed", [_feed(1, day="2025-03-02"), _feed(2, pet="p2"), _feed(3, day="2025-03-01"), _feed(4, day="2025-03-05")])
+    rows = logs.query("feed", pet_id="p1", start="2025-03-01", end="2025-03-02")
+    assert [r["log_id"] for r in rows] == ["f1", "f3"]
+    assert set(rows[0]) == set(LOG_COLS["feed"])
+    assert [r["log_id"] for r in logs.iter_rows("feed", ["p2"], batch=1)] == ["f2"]
+    assert list(logs.iter_rows("feed", [])) == []
+
+def test_migrate_csv_resumes_after_interruption(tmp_path):
+    path = tmp_path / "feed_log.csv"
+    rows = [_feed(i, day=f"2025-03-{i % 28 + 1:02d}") for i in range(2500)]
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        w = csv.DictWriter(f, fieldnames=LOG_COLS["feed"]); w.writeheader(); w.writerows(rows)
+        f.write(",p1,2025-03-01,5,\n")   # log_id 없는 행은 건너뛴다
+    logs = LogStore(str(tmp_path / "logs.db"))
+    logs.append("feed", rows[:1200])   # 지난번 이전이 배치 사이에서 끊긴 상태
+    assert logs.migrate_csv("feed", str(path)) == 1300
+    assert logs.count("feed") == 2500
+    assert not path.exists() and (tmp_path / "feed_log.csv.migrated").exists()
+    assert logs.migrate_csv("feed", str(path)) == 0
+
+def _recount(logs, kind):
+    # 원본 로그에서 직접 다시 센 일별 합계 {(pet_id, date): 합계}
+    amt = LOG_COLS[kind][3]
+    out = {}
+    for r in logs.query(kind):
+        k = (r["pet_id"], r["date"]); out[k] = out.get(k, 0) + r[amt]
+    return out
+
+def _totals(logs, kind, pets):
+    return {(p, d): t for p in pets for d, t in logs.daily_totals(kind, p).items()}
+
+def test_daily_totals_follow_appends_and_clears(tmp_path):
+    rnd = random.Random(0)
+    logs = LogStore(str(tmp_path / "logs.db"))
+    pets = ["p1", "p2", "p3"]
+    for step in range(30):
+        if step % 5 == 4:
+            logs.clear("water", rnd.sample(pets, 1))
+        else:
+            logs.append("water", [{"log_id": f"w{rnd.getrandbits(40)}", "pet_id": rnd.choice(pets),
+                                   "date": f"2025-03-{rnd.randint(1, 5):02d}", "amount_ml": rnd.randint(0, 300), "memo": ""}
+                                  for _ in range(rnd.randint(1, 20))])
+        assert _totals(logs, "water", pets) == _recount(logs, "water")
+    logs.clear("water")
+    assert _totals(logs, "water", pets) == {}
+    assert logs.daily_total("water", "p1", "2025-03-01") == 0
+
+def test_totals_for_existing_db_are_backfilled(tmp_path):
+    path = str(tmp_path / "logs.db")
+    logs = LogStore(path)
+    logs.append("feed", [_feed(1, amount=30), _feed(2, amount=20)])
+    with sqlite3.connect(path) as conn:   # 집계 테이블이 생기기 전 DB
+        conn.execute("DROP TABLE daily_totals")
+        for t in ("feed_log", "water_log"):
+            conn.execute(f"DROP TRIGGER {t}_ins"); conn.execute(f"DROP TRIGGER {t}_del")
+    logs = LogStore(path)
+    assert logs.daily_total("feed", "p1", "2025-03-01") == 50
+    logs.append("feed", [_feed(3, amount=5)])
+    assert logs.daily_total("feed", "p1", "2025-03-01") == 55
+
+def test_rollup_by_iso_week_and_month(tmp_path):
+    logs = LogStore(str(tmp_path / "logs.db"))
+    days = {"2024-12-30": 1, "2025-01-05": 2, "2025-01-06": 4, "2025-01-31": 8, "2025-02-01": 16}
+    logs.append("feed", [_feed(i, day=d, amount=a) for i, (d, a) in enumerate(days.items())])
+    assert logs.rollup("feed", "p1", "week") == {"2025-W01": 3, "2025-W02": 4, "2025-W05": 24}
+    assert logs.rollup("feed", "p1", "month") == {"2024-12": 1, "2025-01": 14, "2025-02": 16}
+    assert logs.rollup("feed", "p1", "month", start="2025-01-06", end="2025-01-31") == {"2025-01": 12}
+    with pytest.raises(ValueError): logs.rollup("feed", "p1", "year")
+
+def test_writes_are_counted_for_the_perf_panel(tmp_path):
+    from petmate import instrument
+    logs = LogStore(str(tmp_path / "logs.db"))
+    instrument.begin("t")
+    try:
+        logs.append("feed", [_feed(1), _feed(2, day="2025-03-02"), _feed(1)])
+        logs.query("feed"); logs.daily_total("feed", "p1", "2025-03-01")
+    finally:
+        rec = instrument.end()
+    assert rec.counts["sqlite"] == 3
+    assert rec.counts["sqlite:rows"] == 4   # 로그 2행 + 트리거가 만든 일별 합계 2행, 조회는 0
@@ -0,0 +1,56 @@
+# 파티션 도입 전 공용 파일 이전: 기존 계정마다 독립된 복사본을 받아야 한다
+import json
+from petmate.service import PetMateService
+
+def _legacy(tmp_path, users):
+    d = tmp_path / "data"; d.mkdir()
+    (d / "users.json").write_text(json.dumps([{"username": u, "password": "x" * 64} for u in users]))
+    (d / "pets.json").write_text(json.dumps([{"id": "p1", "name": "콩이", "species": "개", "weight_kg": 5},
+                                             {"id": "p2", "name": "나비", "species": "고양이", "owner": "b"}]))
+    (d / "med_schedule.json").write_text(json.dumps([{"id": "m1", "pet_id": "p1", "drug": "x", "times": ["08:00"]}]))
+    (d / "feed_log.csv").write_text("log_id,pet_id,date,amount_g,memo\nl1,p1,2025-03-01,40,\n")
+    return str(d)
+
+def test_each_account_gets_an_independent_copy(tmp_path):
+    svc = PetMateService(_legacy(tmp_path, ["a", "b"]))
+    svc.auth.signup("late", "pw")   # 업그레이드 뒤 가입한 계정은 받지 않는다
+    a, b = svc.pets("a"), svc.pets("b")
+    assert [p["name"] for p in a] == ["콩이"] and sorted(p["name"] for p in b) == ["나비", "콩이"]
+    a_id = a[0]["id"]
+    b_id = next(p["id"] for p in b if p["name"] == "콩이")
+    assert len({a_id, b_id, "p1"}) == 3
+    assert next(p["id"] for p in b if p["name"] == "나비") == "p2"   # 한 계정만 받는 pet은 id 그대로
+    assert svc.meds("a")[0]["pet_id"] == a_id and svc.meds("b")[0]["pet_id"] == b_id
+    assert svc.pets("late") == []
+    # 예전 로그는 양쪽에 복사되고, 이후 기록과 초기화는 계정끼리 섞이지 않는다
+    assert svc.logs.daily_total("feed", a_id, "2025-03-01") == svc.logs.daily_total("feed", b_id, "2025-03-01") == 40
+    svc.log_intake("a", [{"pet_id": a_id, "kind": "feed", "amount": 100, "date": "2025-03-02"}])
+    assert svc.logs.daily_total("feed", b_id, "2025-03-02") == 0
+    svc.clear_logs("b")
+    assert svc.logs.daily_total("feed", a_id, "2025-03-02") == 100
+    assert svc.logs.daily_total("feed", a_id, "2025-03-01") == 40
+    # 모두 받아 갔으므로 공용 파일과 예전 id의 로그는 정리됐다
+    assert (tmp_path / "data" / "pets.json.migrated").exists()
+    assert svc.logs.query("feed", pet_id="p1") == []
+
+def test_migration_survives_restart_between_accounts(tmp_path):
+    d = _legacy(tmp_path, ["a", "b"])
+    a_id = PetMateService(d).pets("a")[0]["id"]
+    svc = PetMateService(d)
+    assert svc.pets("a")[0]["id"] == a_id
+    assert sorted(p["name"] for p in svc.pets("b")) == ["나비", "콩이"]
+
+def test_single_account_keeps_ids(tmp_path):
+    svc = PetMateService(_legacy(tmp_path, ["a"]))
+    assert sorted(p["id"] for p in svc.pets("a")) == ["p1", "p2"]   # 없는 계정 소유분도 받는다
+    assert svc.logs.daily_total("feed", "p1", "2025-03-01") == 40
+
+def test_reset_owner_leaves_shared_unsafe_db(tmp_path):
+    svc = PetMateService(str(tmp_path / "data"))
+    svc.save_pet("a", {"name": "콩이"}); svc.save_pet("b", {"name": "나비"})
+    before = svc.unsafe.load()
+    svc.reset_owner("a")
+    assert svc.pets("a") == [] and [p["name"] for p in svc.pets("b")] == ["나비"]
+    assert svc.unsafe.load() == before and before
+    svc.reset_unsafe()
+    assert svc.unsafe.load() == []
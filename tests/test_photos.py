@@ -0,0 +1,83 @@
+# PhotoStore: 참조 수와 저장하지 않은 업로드 정리(sweep)
+import io, os, time
+import pytest
+
+pytest.importorskip("PIL")
+from PIL import Image
+from petmate.photos import PhotoStore
+
+def _png(color):
+    buf = io.BytesIO()
+    Image.new("RGB", (400, 300), color).save(buf, "PNG")
+    return buf.getvalue()
+
+def _age(store, key, seconds):
+    t = time.time() - seconds
+    for p in (store.original_path(key), store.thumbnail_path(key)): os.utime(p, (t, t))
+
+def test_put_dedupes_and_release_deletes(tmp_path):
+    store = PhotoStore(str(tmp_path))
+    key = store.put(_png("red"), "a.png")
+    assert store.put(_png("red"), "b.png") == key
+    assert store.thumbnail(key) is not None
+    store.retain(key); store.retain(key); store.release(key)
+    assert os.path.exists(store.original_path(key))
+    store.release(key)
+    assert not os.path.exists(store.original_path(key)) and store.thumbnail_path(key) is None
+
+def test_sweep_removes_only_old_unreferenced_uploads(tmp_path):
+    store = PhotoStore(str(tmp_path))
+    saved, dropped, fresh = (store.put(_png(c), f"{c}.png") for c in ("red", "green", "blue"))
+    store.retain(saved)
+    for key in (saved, dropped): _age(store, key, 2 * 3600)
+    assert store.sweep(older_than=3600) == 2   # dropped의 원본과 썸네일
+    assert not os.path.exists(store.original_path(dropped)) and store.thumbnail_path(dropped) is None
+    assert os.path.exists(store.original_path(saved))
+    assert os.path.exists(store.original_path(fresh))   # 아직 저장 중일 수 있는 최근 업로드
+    assert store.sweep(older_than=3600) == 0
+
+def test_reupload_restarts_grace_period(tmp_path):
+    store = PhotoStore(str(tmp_path))
+    key = store.put(_png("red"), "a.png")
+    _age(store, key, 2 * 3600)
+    assert store.put(_png("red"), "a.png") == key
+    assert store.sweep(older_than=3600) == 0
+    store.retain(key)
+    assert os.path.exists(store.original_path(key))
+
+def test_service_sweeps_after_save(tmp_path):
+    from petmate.service import PetMateService
+    svc = PetMateService(str(tmp_path))
+    kept = svc.photos.put(_png("red"), "a.png")
+    abandoned = svc.photos.put(_png("green"), "b.png")
+    for key in (kept, abandoned): _age(svc.photos, key, 48 * 3600)
+    svc.save_pet("u", {"name": "콩이", "species": "개", "photo_id": kept})
+    assert os.path.exists(svc.photos.original_path(kept))
+    assert not os.path.exists(svc.photos.original_path(abandoned))
+
+def test_concurrent_saves_keep_refcounts_exact(tmp_path):
+    import json, threading
+    from petmate.service import PetMateService
+    svc = PetMateService(str(tmp_path))
+    keys = [svc.photos.put(_png(c), f"{c}.png") for c in ("red", "green", "blue")]
+    pet = svc.save_pet("u", {"name": "콩이", "species": "개"})[0]
+    start = threading.Barrier(4)
+    def worker(i):
+        start.wait()
+        for n in range(15):
+            svc.save_pet("u", dict(pet, photo_id=keys[(i + n) % 3]))
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(4)]
+    for t in threads: t.start()
+    for t in threads: t.join()
+    final = svc.pets("u")[0]["photo_id"]
+    with open(svc.photos.refs_path) as f: assert json.load(f) == {final: 1}
+    # 같은 pet을 두 세션이 동시에 지워도 참조는 한 번만 줄어든다
+    other = svc.save_pet("u", {"name": "나비", "species": "고양이", "photo_id": final})[-1]
+    start = threading.Barrier(2)
+    def drop():
+        start.wait(); svc.delete_pet("u", pet["id"])
+    threads = [threading.Thread(target=drop) for _ in range(2)]
+    for t in threads: t.start()
+    for t in threads: t.join()
+    assert [p["id"] for p in svc.pets("u")] == [other["id"]]
+    with open(svc.photos.refs_path) as f: assert json.load(f) == {final: 1}
@@ -0,0 +1,95 @@
+# ReminderQueue의 due()/next_doses()를 iter_occurrences로 전부 펼친 결과와 비교
+import random
+from datetime import datetime, timedelta
+import pytest
+from petmate.reminders import ReminderQueue, iter_occurrences, parse_schedule
+
+WINDOW = timedelta(minutes=30)
+
+def _record(rnd, sid):
+    times = [f"{rnd.randrange(24):02d}:{rnd.choice((0, 10, 15, 30, 45)):02d}" for _ in range(rnd.randint(1, 3))]
+    if rnd.random() < 0.1: times.append("25:99")   # 잘못된 시간은 버려진다
+    end = "" if rnd.random() < 0.5 else f"2025-04-{rnd.randint(1, 20):02d}"
+    return {"id": sid, "pet_id": f"p{rnd.randrange(5)}", "drug": "d", "dose": "1", "unit": "정",
+            "times": times, "start": f"2025-{rnd.randint(3, 4):02d}-{rnd.randint(1, 10):02d}", "end": end}
+
+class BruteForce:
+    """스케줄마다 '언제부터 알림 대상인지(since)'만 기억하는 단순 모델"""
+
+    def __init__(self, records, now):
+        self.scheds, self.since, self.cursor = {}, {}, now
+        for r in records: self.add(r, None)
+
+    def add(self, rec, since):
+        s = parse_schedule(rec)
+        if s is None: self.scheds.pop(rec["id"], None); return
+        self.scheds[rec["id"]], self.since[rec["id"]] = s, since
+
+    def remove(self, sid):
+        self.scheds.pop(sid, None)
+
+    def advance(self, now):
+        if now < self.cursor: self.since = dict.fromkeys(self.since)   # 큐는 처음부터 다시 만든다
+        self.cursor = now
+
+    def due(self, now):
+        out = []
+        for sid, s in self.scheds.items():
+            after = max(now - WINDOW, self.since[sid] or now - WINDOW)
+            for dt in iter_occurrences(s, after, inclusive=False):
+                if dt > now: break
+                out.append((dt, sid))
+        return sorted(out)
+
+    def upcoming(self, n):
+        out = []
+        for sid, s in self.scheds.items():
+            for dt, _ in zip(iter_occurrences(s, self.cursor, inclusive=False), range(n)): out.append((dt, sid))
+        return sorted(out)[:n]
+
+def _check_next(q, model, n):
+    got = [(dt, s.id) for dt, s in q.next_doses(n)]
+    want = model.upcoming(n)
+    assert [dt for dt, _ in got] == [dt for dt, _ in want]
+    if got:   # 마지막 시각에 걸친 동률은 어느 스케줄이 들어가도 된다
+        last = got[-1][0]
+        assert sorted(p for p in got if p[0] < last) == [p for p in want if p[0] < last]
+        assert len(set(got)) == len(got)
+
+@pytest.mark.parametrize("seed", range(20))
+def test_matches_brute_force(seed):
+    rnd = random.Random(seed)
+    now = datetime(2025, 3, 5, 7, 0)
+    records = [_record(rnd, f"m{i}") for i in range(rnd.randint(0, 30))]
+    q, model = ReminderQueue(records, now, window=WINDOW), BruteForce(records, now)
+    ids = [r["id"] for r in records]
+    for step in range(150):
+        r = rnd.random()
+        if r < 0.6:
+            now += timedelta(minutes=rnd.choice((1, 5, 10, 29, 30, 31, 90, 60 * 24, 60 * 24 * 3)))
+        elif r < 0.65:
+            now -= timedelta(minutes=rnd.choice((1, 45, 60 * 24)))   # 시계가 뒤로 감
+        elif r < 0.8:
+            sid = rnd.choice(ids) if ids and rnd.random() < 0.5 else f"m{len(ids)}"
+            if sid not in ids: ids.append(sid)
+            rec = _record(rnd, sid)
+            q.add(rec); model.add(rec, q.cursor)
+            continue
+        elif ids:
+            sid = rnd.choice(ids)
+            q.remove(sid); model.remove(sid)
+            continue
+        model.advance(now)
+        assert sorted((dt, s.id) for dt, s in q.due(now)) == model.due(now), step
+        _check_next(q, model, rnd.choice((1, 5, 20)))
+    assert len(q) == len(model.scheds)
+
+def test_next_doses_does_not_consume_queue():
+    now = datetime(2025, 4, 1, 7, 0)
+    q = ReminderQueue([{"id": "a", "pet_id": "p", "times": ["08:00", "20:00"], "start": "2025-04-01"}], now)
+    first = q.next_doses(5)
+    assert [dt for dt, _ in first] == [datetime(2025, 4, 1, 8), datetime(2025, 4, 1, 20), datetime(2025, 4, 2, 8),
+                                       datetime(2025, 4, 2, 20), datetime(2025, 4, 3, 8)]
+    assert q.next_doses(5) == first
+    assert [dt for dt, _ in q.due(datetime(2025, 4, 1, 8, 10))] == [datetime(2025, 4, 1, 8)]
+    assert q.due(datetime(2025, 4, 1, 8, 31)) == []
@@ -0,0 +1,60 @@
+# 위험 정보 검색: 초성/자모 부분 입력, 별칭·설명 일치, 한 건씩 추가한 인덱스와 전체 재구성 결과 비교
+import random
+from petmate.unsafe_index import UnsafeIndex, jamo_key, chosung_key
+from petmate.service import PetMateService
+
+ITEMS = [
+    {"id": "1", "category": "음식", "name": "초콜릿", "risk": "고위험", "why": "테오브로민 중독", "aliases": ["카카오"]},
+    {"id": "2", "category": "음식", "name": "포도", "risk": "고위험", "why": "급성 신부전", "aliases": "건포도, 청포도"},
+    {"id": "3", "category": "음식", "name": "양파", "risk": "고위험", "why": "적혈구 손상으로 빈혈", "aliases": []},
+    {"id": "4", "category": "식물", "name": "백합", "risk": "중간-고위험", "why": "고양이 신장 손상", "aliases": []},
+    {"id": "5", "category": "음식", "name": "초코우유", "risk": "주의", "why": "유당과 카카오", "aliases": []},
+]
+
+def names(rs): return [r["name"] for r in rs]
+
+def test_keys():
+    assert jamo_key("초콜릿") == "ㅊㅗㅋㅗㄹㄹㅣㅅ" and jamo_key("초ㅋ") == "ㅊㅗㅋ"
+    assert chosung_key("초콜릿") == "ㅊㅋㄹ"
+    assert jamo_key("ㅘ") == jamo_key("와")[1:]   # 겹모음 직접 입력도 분해 결과와 같다
+
+def test_chosung_and_partial_syllable():
+    idx = UnsafeIndex(ITEMS)
+    assert names(idx.search("ㅊㅋ"))[0] == "초콜릿"
+    assert names(idx.search("ㅊㅋㄹ")) == ["초콜릿"]
+    assert names(idx.search("초ㅋ"))[:2] == ["초콜릿", "초코우유"]   # 같은 점수면 위험도 높은 것 먼저
+
+def test_alias_and_why():
+    idx = UnsafeIndex(ITEMS)
+    assert names(idx.search("건포도")) == ["포도"]   # 쉼표 문자열 별칭
+    assert names(idx.search("카카오")) == ["초콜릿", "초코우유"]   # 별칭 > 설명
+    assert names(idx.search("빈혈")) == ["양파"]
+    assert idx.search("ㅂ") and "양파" not in names(idx.search("ㅂ"))   # 한 자모로는 설명을 보지 않는다
+
+def test_no_query_lists_by_category():
+    idx = UnsafeIndex(ITEMS)
+    assert names(idx.search("")) == ["백합", "초콜릿", "포도", "양파", "초코우유"]   # 같은 분류·위험도는 입력 순
+
+def test_incremental_add_matches_rebuild():
+    rng = random.Random(3)
+    idx = UnsafeIndex()
+    live = {}
+    for step in range(60):
+        it = dict(rng.choice(ITEMS))
+        it["id"] = str(rng.randrange(8))   # 같은 id면 교체
+        it["name"] += str(step % 3)
+        idx.add(it); live[it["id"]] = it
+    fresh = UnsafeIndex(live.values())
+    assert len(idx) == len(fresh) == len(live)
+    for q in ["ㅊㅋ", "초", "포도", "카카오", "신장", "1", ""]:
+        assert sorted(names(idx.search(q))) == sorted(names(fresh.search(q)))
+
+def test_service_index_follows_file(tmp_path):
+    svc = PetMateService(str(tmp_path))
+    svc.reset_unsafe()
+    svc.add_unsafe("음식", "자일리톨 껌", "고위험", "저혈당", "자일리톨")
+    idx = svc.unsafe_index()
+    assert idx.version == svc.unsafe.version()   # 한 건 반영으로 재구성 없이 최신
+    assert names(svc.search_unsafe("ㅈㅇㄹ")) == ["자일리톨 껌"]
+    svc.unsafe.replace_all(ITEMS)   # 다른 경로로 바뀐 파일은 다음 조회 때 재구성
+    assert names(svc.search_unsafe("ㅊㅋ"))[0] == "초콜릿" and not svc.search_unsafe("자일리톨")